@@ -0,0 +1,31 @@
+from collections.abc import Iterator
+
+import numpy as np
+
+BATCH_OPERATIONS = {
+    1: np.hypot,
+    2: np.add,
+    3: np.subtract,
+    4: np.multiply,
+    5: np.divide,
+}
+
+
+def as_operand_array(operands):
+    # Generators and other iterators are read into a list first, np.asarray would wrap them as a single object.
+    # Scalars, sequences and arrays go straight to np.asarray so scalars broadcast against the other operand.
+    if isinstance(operands, Iterator):
+        operands = list(operands)
+    return np.asarray(operands)
+
+
+def calculate_batch(operator, a, b):
+    # Same operator codes as handle_operator_selection, applied to whole arrays of operands in one pass.
+    # Dividing by zero gives inf or nan instead of raising.
+    operation = BATCH_OPERATIONS.get(operator)
+    if operation is None:
+        print("Invalid operator")
+        return None
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return operation(as_operand_array(a), as_operand_array(b))
@@ -0,0 +1,271 @@
+import argparse
+import functools
+import random
+import re
+import sys
+import time
+
+from Lab.Lab1.calculator import add, subtract, multiply, divide
+from Lab.Lab1.hypotenuse import calculate_hypotenuse
+
+# Binary operators by symbol: (precedence, function).
+BINARY_OPERATORS = {
+    "+": (1, add),
+    "-": (1, subtract),
+    "*": (2, multiply),
+    "/": (2, divide),
+}
+
+# Named functions by name: (number of arguments, function).
+FUNCTIONS = {
+    "hyp": (2, calculate_hypotenuse),
+}
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?|([A-Za-z_]\w*)|(\S))")
+SIMPLE_EXPRESSION_PATTERN = re.compile(r"\s*(-?\d+)\s*([-+*/])\s*(-?\d+)\s*")
+
+# Limits that turn input the parser or int() cannot handle into syntax errors: the deepest nesting of brackets
+# and unary signs, kept well under the recursion limit, and the most digits in an integer, under the 4300 digits
+# int() converts by default.
+MAX_NESTING_DEPTH = 100
+MAX_INTEGER_DIGITS = 4000
+
+
+class ExpressionSyntaxError(Exception):
+    def __init__(self, my_msg):
+        super().__init__(my_msg)
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        number, name, symbol = match.group(0).strip(), match.group(2), match.group(3)
+        if symbol is not None:
+            tokens.append(("symbol", symbol))
+        elif name is not None:
+            tokens.append(("name", name))
+        elif any(c in number for c in ".eE"):
+            tokens.append(("number", float(number)))
+        else:
+            tokens.append(("number", _parse_integer(number)))
+        position = match.end()
+    return tokens
+
+
+def _parse_integer(digits):
+    if len(digits.lstrip("-")) > MAX_INTEGER_DIGITS:
+        raise ExpressionSyntaxError(f"Integers are limited to {MAX_INTEGER_DIGITS} digits")
+    return int(digits)
+
+
+class _Parser:
+    # Recursive descent parser that turns tokens into a tree of closures, folding constant subtrees into values.
+    # Expressions of the form "a op b" skip the parser, see SIMPLE_EXPRESSION_PATTERN.
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def expect(self, symbol):
+        kind, value = self.peek()
+        if kind != "symbol" or value != symbol:
+            raise ExpressionSyntaxError(f"Expected '{symbol}'")
+        self.position += 1
+
+    def enter(self):
+        self.depth += 1
+        if self.depth > MAX_NESTING_DEPTH:
+            raise ExpressionSyntaxError(f"Expressions are limited to {MAX_NESTING_DEPTH} levels of nesting")
+
+    def parse(self):
+        node = self.parse_binary(1)
+        if self.position != len(self.tokens):
+            raise ExpressionSyntaxError(f"Unexpected '{self.tokens[self.position][1]}'")
+        return node
+
+    def parse_binary(self, minimum_precedence):
+        left = self.parse_unary()
+        while True:
+            kind, value = self.peek()
+            if kind != "symbol" or value not in BINARY_OPERATORS:
+                return left
+            precedence, function = BINARY_OPERATORS[value]
+            if precedence < minimum_precedence:
+                return left
+            self.position += 1
+            right = self.parse_binary(precedence + 1)
+            left = _combine(function, (left, right))
+
+    def parse_unary(self):
+        kind, value = self.peek()
+        if kind == "symbol" and value in "+-":
+            self.position += 1
+            self.enter()
+            operand = self.parse_unary()
+            self.depth -= 1
+            return operand if value == "+" else _combine(subtract, (0, operand))
+        return self.parse_primary()
+
+    def parse_primary(self):
+        kind, value = self.peek()
+        self.position += 1
+        if kind == "number":
+            return value
+        if kind == "symbol" and value == "(":
+            self.enter()
+            node = self.parse_binary(1)
+            self.expect(")")
+            self.depth -= 1
+            return node
+        if kind == "name":
+            if value not in FUNCTIONS:
+                raise ExpressionSyntaxError(f"Unknown function '{value}'")
+            argument_count, function = FUNCTIONS[value]
+            self.expect("(")
+            self.enter()
+            arguments = [self.parse_binary(1)]
+            while len(arguments) < argument_count:
+                self.expect(",")
+                arguments.append(self.parse_binary(1))
+            self.expect(")")
+            self.depth -= 1
+            return _combine(function, tuple(arguments))
+        raise ExpressionSyntaxError("Unexpected end of expression" if kind is None else f"Unexpected '{value}'")
+
+
+def _combine(function, operands):
+    # Operands are numbers or zero-argument callables. Operators are looked up in the dispatch tables while
+    # parsing, so a node made only of numbers is computed right away and never dispatched again.
+    if not any(callable(operand) for operand in operands):
+        try:
+            return function(*operands)
+        except (ZeroDivisionError, OverflowError) as error:
+            return _raiser(error)
+    evaluators = tuple(operand if callable(operand) else _constant_evaluator(operand) for operand in operands)
+    return lambda: function(*(evaluate() for evaluate in evaluators))
+
+
+def _raiser(error):
+    # Defers an error found while folding constants until the expression is evaluated.
+    def raise_error():
+        raise error
+    return raise_error
+
+
+def _constant_evaluator(value):
+    return lambda: value
+
+
+@functools.lru_cache(maxsize=65536)
+def compile_expression(text):
+    # Returns a zero-argument function that evaluates the expression. Compiled expressions are cached by text, and
+    # since expressions are made only of numbers they are computed once, at compile time.
+    simple = SIMPLE_EXPRESSION_PATTERN.fullmatch(text)
+    if simple:
+        node = _combine(BINARY_OPERATORS[simple.group(2)][1],
+                        (_parse_integer(simple.group(1)), _parse_integer(simple.group(3))))
+    else:
+        tokens = tokenize(text)
+        if not tokens:
+            raise ExpressionSyntaxError("Empty expression")
+        node = _Parser(tokens).parse()
+    if callable(node):
+        return node
+    return _constant_evaluator(node)
+
+
+def evaluate_expression(text):
+    return compile_expression(text.strip())()
+
+
+@functools.lru_cache(maxsize=65536)
+def _result_line(line):
+    simple = SIMPLE_EXPRESSION_PATTERN.fullmatch(line)
+    try:
+        if simple:
+            # "a op b" lines are computed right away rather than compiled into a cached evaluator first
+            a, operator, b = simple.groups()
+            return f"{BINARY_OPERATORS[operator][1](_parse_integer(a), _parse_integer(b))}\n"
+        return f"{compile_expression(line)()}\n"
+    except (ExpressionSyntaxError, ZeroDivisionError, OverflowError) as error:
+        return f"Error: {error}\n"
+    except (RecursionError, ValueError) as error:
+        # the limits above should stop these, but one bad line must never end the stream
+        return f"Error: {type(error).__name__}: {error}\n"
+
+
+def evaluate_stream(lines):
+    # Yields one result line per expression line. Blank lines are skipped, and a bad expression yields an error
+    # line instead of stopping the stream. Result lines are cached by expression, so a repeated expression costs
+    # one cache lookup.
+    result_line = _result_line
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield result_line(line)
+
+
+def _time_stream(lines):
+    compile_expression.cache_clear()
+    _result_line.cache_clear()
+    start_time = time.perf_counter()
+    for _ in evaluate_stream(lines):
+        pass
+    return time.perf_counter() - start_time
+
+
+def run_benchmark(count, distinct_count):
+    # Times the same number of lines twice: all distinct, so every line is parsed and computed, and drawn from
+    # distinct_count expressions, so repeats are answered from the result cache. Only the first is the
+    # evaluator's own throughput, the second depends on how often the input repeats itself.
+    operators = list(BINARY_OPERATORS)
+    runs = [
+        ("all distinct, uncached",
+         [f"{number} {random.choice(operators)} {random.randrange(1, 1000)}" for number in range(1, count + 1)]),
+    ]
+    pool = [f"{random.randrange(1, 1000)} {random.choice(operators)} {random.randrange(1, 1000)}"
+            for _ in range(distinct_count)]
+    runs.append((f"{distinct_count:,} distinct, cached repeats", [random.choice(pool) for _ in range(count)]))
+    for name, lines in runs:
+        elapsed = _time_stream(lines)
+        print(f"Evaluated {count:,} expressions ({name}) in {elapsed:.3f} seconds: "
+              f"{count / elapsed:,.0f} expressions per second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluates one expression per line, for example '3 + 4' or "
+                                                 "'hyp(3, 4) * 2'.")
+    parser.add_argument("input", nargs="?", help="The file of expressions to read, stdin by default.")
+    parser.add_argument("-o", "--output", help="The file to write results to, stdout by default.")
+    parser.add_argument("-b", "--benchmark", type=int, metavar="COUNT",
+                        help="Time COUNT generated expressions instead of reading input.")
+    parser.add_argument("-d", "--distinct", type=int, default=10000,
+                        help="The number of distinct expressions in the benchmark's cached run.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.distinct)
+        return
+
+    input_file = open(args.input, mode='r', encoding='utf-8') if args.input else sys.stdin
+    output_file = open(args.output, mode='w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        output_file.writelines(evaluate_stream(input_file))
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import math
 
 
 def calculate_hypotenuse(a, b):
-    return math.sqrt(a ** 2 + b ** 2)
+    return math.hypot(a, b)
 
 
 def main():
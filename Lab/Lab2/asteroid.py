@@ -2,14 +2,26 @@
 
 
 from itertools import count
+import functools
 import math
 import random
 
 
+@functools.lru_cache(maxsize=None)
+def _shared_velocity(x, y, z):
+    """
+    Return one shared tuple for each distinct velocity.
+    :return: Tuple with three integers.
+    """
+    return x, y, z
+
+
 class Asteroid:
     """Represents an asteroid with its circumference in metres, position, velocity.
 
     Both position and velocity are vectors with x y z coordinates that are measured in metres per second"""
+    __slots__ = ("__circumference", "__position", "__velocity", "__id")
+
     id_counter = 0
 
     def __init__(self, circumference, position, velocity):
@@ -36,6 +48,7 @@ class Asteroid:
         return Asteroid.id_counter
 
     @staticmethod
+    @functools.lru_cache(maxsize=128)
     def calculate_circumference(radius):
         """
         Return circumference of asteroid in metres given a positive radius in metres.
@@ -58,9 +71,11 @@ class Asteroid:
     def generate_random_velocity():
         """
         Generates random velocity of asteroid with a maximum of 5.
+
+        There are only 125 possible velocities, so the tuples are shared between asteroids instead of allocated each.
         :return: Tuple with three integers.
         """
-        return random.randrange(5), random.randrange(5), random.randrange(5)
+        return _shared_velocity(random.randrange(5), random.randrange(5), random.randrange(5))
 
     @staticmethod
     def generate_random_asteroid():
@@ -75,17 +90,67 @@ class Asteroid:
                         Asteroid.generate_random_position(),
                         Asteroid.generate_random_velocity())
 
-    def move(self):
+    def move(self, dt=1, verbose=True):
         """
-        Move asteroid by adding the vector of velocity to position, print new and old position, return the new position.
+        Move asteroid by adding the vector of velocity times dt to position, print new and old position, return the new
+        position.
 
+        :param dt: The number of seconds to move for, 1 by default.
+        :param verbose: A boolean, False to move without printing.
         :return: Tuple of the new position.
         """
         old_position = self.__position
-        self.__position = tuple(map(sum, zip(self.__position, self.__velocity)))
-        print(f"Asteroid {self.__id} Moved! Old Pos: {old_position} -> New Pos: {self.__position}")
+        if dt == 1:
+            self.__position = tuple(map(sum, zip(self.__position, self.__velocity)))
+        else:
+            self.__position = tuple(position + velocity * dt
+                                    for position, velocity in zip(self.__position, self.__velocity))
+        if verbose:
+            print(f"Asteroid {self.__id} Moved! Old Pos: {old_position} -> New Pos: {self.__position}")
         return self.__position
 
+    def position_at(self, ticks, dt=1):
+        """
+        Return the position this asteroid will have after a number of ticks, without moving it.
+
+        :param ticks: A non-negative integer.
+        :param dt: The number of seconds per tick, 1 by default.
+        :return: Tuple of the future position.
+        """
+        return tuple(position + velocity * ticks * dt for position, velocity in zip(self.__position, self.__velocity))
+
+    def first_approach_tick(self, other, threshold, dt=1):
+        """
+        Return the earliest tick at which this asteroid and another come within threshold of each other.
+
+        The squared distance between the two is a quadratic in time, so the answer comes from its roots instead of
+        moving the asteroids tick by tick. Tick 0 is their current position.
+        :param other: An Asteroid.
+        :param threshold: A non-negative number, the distance between centres to look for.
+        :param dt: The number of seconds per tick, 1 by default.
+        :return: An integer tick, or None if they never come within threshold.
+        """
+        relative_position = [b - a for a, b in zip(self.__position, other.position)]
+        relative_velocity = [b - a for a, b in zip(self.__velocity, other.velocity)]
+        a = sum(v * v for v in relative_velocity)
+        b = 2 * sum(p * v for p, v in zip(relative_position, relative_velocity))
+        c = sum(p * p for p in relative_position) - threshold * threshold
+        if c <= 0:
+            return 0
+        discriminant = b * b - 4 * a * c
+        if a == 0 or discriminant < 0:
+            return None
+        enter = (-b - math.sqrt(discriminant)) / (2 * a)
+        leave = (-b + math.sqrt(discriminant)) / (2 * a)
+        tick = math.ceil(max(enter, 0) / dt)
+        return tick if tick * dt <= leave else None
+
+    def get_id(self):
+        """
+        :return: Returns the asteroid id as an integer.
+        """
+        return self.__id
+
     def get_circumference(self):
         """
         :return: Returns the circumference as a number.
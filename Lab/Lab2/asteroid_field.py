@@ -0,0 +1,290 @@
+"""This module implements the AsteroidField class, a structure-of-arrays store for many asteroids."""
+
+
+import math
+
+import numpy as np
+
+from Lab.Lab2.asteroid import Asteroid
+from Lab.Lab2.lookahead import first_approach_ticks, positions_at
+
+# Bounds of the seven numbers drawn for every random asteroid: radius, then x y z position, then x y z velocity.
+# They match the ranges used by Asteroid.generate_random_asteroid().
+_RANDOM_ASTEROID_LOWS = np.array([1, 0, 0, 0, 0, 0, 0])
+_RANDOM_ASTEROID_HIGHS = np.array([4, 100, 100, 100, 5, 5, 5])
+
+
+class AsteroidField:
+    """
+    Stores a whole field of asteroids in contiguous arrays and moves them all at once.
+
+    Positions and velocities are N x 3 arrays, circumferences and ids are arrays of length N. Indexing or iterating
+    the field yields AsteroidView objects that behave like Asteroid instances but read and write the arrays.
+    """
+
+    def __init__(self, circumferences, positions, velocities, ids=None):
+        """
+        Initialize a new field from array-likes, assigning asteroid ids from the Asteroid id counter if none are given.
+
+        :precondition: positions and velocities must have the shape (N, 3), circumferences must have length N.
+        :param circumferences: A sequence of N positive floats.
+        :param positions: A sequence of N x y z coordinates.
+        :param velocities: A sequence of N x y z velocities.
+        :param ids: A sequence of N integers, or None.
+        """
+        self.circumferences = np.ascontiguousarray(circumferences, dtype=np.float64).reshape(-1)
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 3)
+        self.velocities = np.array(velocities, dtype=np.float64).reshape(-1, 3)
+        if not len(self.circumferences) == len(self.positions) == len(self.velocities):
+            raise ValueError("circumferences, positions and velocities must all describe the same number of asteroids")
+        if ids is None:
+            ids = self.reserve_ids(len(self.circumferences))
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64).reshape(-1)
+
+    @staticmethod
+    def reserve_ids(count):
+        """
+        Reserves count consecutive ids from the Asteroid id counter, so fields and asteroids never share an id.
+
+        :param count: A non-negative integer.
+        :return: An array of count new ids.
+        """
+        first_id = Asteroid.id_counter + 1
+        Asteroid.id_counter += count
+        return np.arange(first_id, first_id + count, dtype=np.int64)
+
+    @classmethod
+    def from_asteroids(cls, asteroids):
+        """
+        Return a new field holding copies of the given asteroids' data, keeping their ids.
+
+        :param asteroids: An iterable of Asteroid instances.
+        :return: An AsteroidField.
+        """
+        asteroids = list(asteroids)
+        return cls([asteroid.circumference for asteroid in asteroids],
+                   [asteroid.position for asteroid in asteroids],
+                   [asteroid.velocity for asteroid in asteroids],
+                   [asteroid.get_id() for asteroid in asteroids])
+
+    def move(self, dt=1):
+        """
+        Move every asteroid by adding its velocity times dt to its position in one batched operation.
+
+        :param dt: The number of seconds to move for, 1 by default.
+        :return: The N x 3 array of new positions.
+        """
+        if dt == 1:
+            self.positions += self.velocities
+        else:
+            self.positions += self.velocities * dt
+        return self.positions
+
+    def positions_at(self, ticks, dt=1):
+        """
+        Return the positions every asteroid will have after a number of ticks, without moving the field.
+
+        :param ticks: A non-negative integer.
+        :param dt: A positive number, the virtual seconds per tick.
+        :return: An N x 3 array of future positions.
+        """
+        return positions_at(self.positions, self.velocities, ticks, dt)
+
+    def first_approach_ticks(self, index, threshold, dt=1, max_tick=None):
+        """
+        Return the earliest tick at which every asteroid comes within threshold of the asteroid at index.
+
+        :param index: An integer index into the field.
+        :param threshold: A non-negative number, the distance between centres to look for.
+        :param dt: A positive number, the virtual seconds per tick.
+        :param max_tick: An integer, ticks after it are reported as never, or None for no limit.
+        :return: An array of N integer ticks, -1 for never and for the asteroid itself.
+        """
+        ticks = first_approach_ticks(self.positions[index], self.velocities[index], self.positions, self.velocities,
+                                     threshold, dt, max_tick)
+        ticks[index] = -1
+        return ticks
+
+    def first_approach_ticks_for_pairs(self, first_indices, second_indices, threshold, dt=1, max_tick=None):
+        """
+        Return the earliest tick at which each given pair of asteroids comes within threshold of each other.
+
+        :param first_indices: An array of M integer indices into the field.
+        :param second_indices: An array of M integer indices into the field.
+        :param threshold: A non-negative number, or array of M numbers, the distance between centres to look for.
+        :param dt: A positive number, the virtual seconds per tick.
+        :param max_tick: An integer, ticks after it are reported as never, or None for no limit.
+        :return: An array of M integer ticks, -1 where the pair never comes within threshold.
+        """
+        return first_approach_ticks(self.positions[first_indices], self.velocities[first_indices],
+                                    self.positions[second_indices], self.velocities[second_indices],
+                                    threshold, dt, max_tick)
+
+    def __len__(self):
+        """
+        :return: The number of asteroids in the field.
+        """
+        return len(self.circumferences)
+
+    def __getitem__(self, index):
+        """
+        :param index: An integer index into the field.
+        :return: An AsteroidView of the asteroid at index.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("asteroid index out of range")
+        return AsteroidView(self, index)
+
+    def __iter__(self):
+        """
+        :return: An iterator of AsteroidView objects, one for each asteroid.
+        """
+        for index in range(len(self)):
+            yield AsteroidView(self, index)
+
+
+class AsteroidView:
+    """
+    A lightweight Asteroid-compatible view of one asteroid in an AsteroidField.
+
+    Reads and writes go straight to the field's arrays, so the view never holds a copy of the asteroid's data.
+    """
+    __slots__ = ("_field", "_index")
+
+    def __init__(self, field, index):
+        """
+        :param field: The AsteroidField holding the asteroid.
+        :param index: An integer index into the field.
+        """
+        self._field = field
+        self._index = index
+
+    def move(self, dt=1, verbose=True):
+        """
+        Move this asteroid alone by adding its velocity times dt to its position, print new and old position, return
+        the new position.
+
+        :param dt: The number of seconds to move for, 1 by default.
+        :param verbose: A boolean, False to move without printing.
+        :return: Tuple of the new position.
+        """
+        old_position = self.get_position()
+        self._field.positions[self._index] += self._field.velocities[self._index] * dt
+        if verbose:
+            print(f"Asteroid {self.get_id()} Moved! Old Pos: {old_position} -> New Pos: {self.get_position()}")
+        return self.get_position()
+
+    def position_at(self, ticks, dt=1):
+        """
+        Return the position this asteroid will have after a number of ticks, without moving it.
+
+        :param ticks: A non-negative integer.
+        :param dt: A positive number, the virtual seconds per tick.
+        :return: A tuple with three floats.
+        """
+        return tuple(positions_at(self._field.positions[self._index], self._field.velocities[self._index],
+                                  ticks, dt).tolist())
+
+    def get_id(self):
+        """
+        :return: The asteroid id as an integer.
+        """
+        return int(self._field.ids[self._index])
+
+    def get_circumference(self):
+        """
+        :return: Returns the circumference as a number.
+        """
+        return float(self._field.circumferences[self._index])
+
+    def set_circumference(self, circumference):
+        """
+        Sets the circumference to the parameter.
+        :param circumference: A positive number.
+        :precondition: Circumference must be a positive number.
+        """
+        if circumference > 0:
+            self._field.circumferences[self._index] = circumference
+
+    def get_position(self):
+        """
+        Returns the position as a tuple with three floats representing x y z.
+        :return: A tuple with three floats.
+        """
+        return tuple(self._field.positions[self._index].tolist())
+
+    def set_position(self, position):
+        """
+        Sets the position.
+        :param position: Tuple with three numbers representing x y z.
+        :precondition: Position must be tuple with three numbers.
+        """
+        if isinstance(position, tuple) and len(position) == 3:
+            self._field.positions[self._index] = position
+
+    def get_velocity(self):
+        """
+        Returns the velocity as a tuple with three floats representing x y z.
+        :return: A tuple with three floats.
+        """
+        return tuple(self._field.velocities[self._index].tolist())
+
+    def set_velocity(self, velocity):
+        """
+        Sets the velocity.
+        :param velocity: Tuple with three numbers representing x y z.
+        :precondition: Velocity must be tuple with three numbers.
+        """
+        if isinstance(velocity, tuple) and len(velocity) == 3:
+            self._field.velocities[self._index] = velocity
+
+    circumference = property(get_circumference, set_circumference)
+
+    velocity = property(get_velocity, set_velocity)
+
+    position = property(get_position, set_position)
+
+    def __repr__(self):
+        """
+        :return: string representation of this object instance.
+        """
+        return f"Asteroid ID: {self.get_id()} Circumference: {self.get_circumference():} " \
+               f"Position: {self.get_position()} Velocity: {self.get_velocity()}"
+
+    def __str__(self):
+        """
+        :return: string of this Asteroid's information
+        """
+        return f"Asteroid {self.get_id()} is currently at {self.get_position()} and moving at {self.get_velocity()} " \
+               f"metres per second. It has a circumference of {self.get_circumference():_})"
+
+
+def iter_random_field_chunks(count, chunk_size=1_000_000, seed=None):
+    """
+    Generate a random field of count asteroids in AsteroidFields of at most chunk_size asteroids each.
+
+    All seven numbers of a chunk are drawn in a single call, one row per asteroid, so the asteroids generated for a
+    seed are the same whatever the chunk size.
+    :param count: A non-negative integer.
+    :param chunk_size: A positive integer, the largest number of asteroids held in memory at once.
+    :param seed: An integer seed, or None for a different field every time.
+    :return: A generator of AsteroidField chunks.
+    """
+    random_generator = np.random.default_rng(seed)
+    for start in range(0, count, chunk_size):
+        draws = random_generator.integers(_RANDOM_ASTEROID_LOWS, _RANDOM_ASTEROID_HIGHS,
+                                          size=(min(chunk_size, count - start), 7))
+        yield AsteroidField(2 * draws[:, 0] * math.pi, draws[:, 1:4], draws[:, 4:7])
+
+
+def generate_random_field(count, seed=None):
+    """
+    Return a field of count random asteroids, with the same ranges as Asteroid.generate_random_asteroid().
+
+    :param count: A non-negative integer.
+    :param seed: An integer seed, or None for a different field every time.
+    :return: An AsteroidField.
+    """
+    return next(iter_random_field_chunks(count, max(count, 1), seed), None) or AsteroidField([], [], [])
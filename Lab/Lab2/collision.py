@@ -0,0 +1,175 @@
+"""This module implements spatial hash based collision and proximity detection for asteroids."""
+
+
+import itertools
+import math
+
+import numpy as np
+
+
+# The cell itself plus the 13 neighbouring cells that come after it, so every pair of adjacent cells is visited once.
+_HALF_NEIGHBOURHOOD = [offset for offset in itertools.product((-1, 0, 1), repeat=3) if offset > (0, 0, 0)]
+
+
+def radii_from_circumferences(circumferences):
+    """
+    Return the radius of every asteroid given its circumference.
+    :param circumferences: An array of N positive numbers.
+    :return: An array of N radii.
+    """
+    return np.asarray(circumferences, dtype=np.float64) / (2 * math.pi)
+
+
+class SpatialHashGrid:
+    """
+    Buckets points into a uniform grid of cubic cells so neighbours can be found without comparing every pair.
+
+    The grid is rebuilt from scratch each time build() is called, which is a sort of N cell keys. As long as the cell
+    size is at least the largest distance being searched for, only the 26 cells around a point need to be checked.
+    """
+
+    def __init__(self, cell_size):
+        """
+        :param cell_size: A positive number, the edge length of a grid cell.
+        """
+        if not cell_size > 0:
+            raise ValueError("cell_size must be a positive number")
+        self.cell_size = float(cell_size)
+        self._positions = None
+        self._order = None
+        self._cell_keys = None
+        self._cell_starts = None
+        self._cell_counts = None
+        self._origin = None
+        self._strides = None
+
+    def build(self, positions):
+        """
+        Bucket the given positions into grid cells, replacing anything bucketed before.
+        :param positions: An N x 3 array of positions.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self._positions = positions
+        if len(positions) == 0:
+            self._order = np.empty(0, dtype=np.int64)
+            self._cell_keys = np.empty(0, dtype=np.int64)
+            self._cell_starts = np.empty(0, dtype=np.int64)
+            self._cell_counts = np.empty(0, dtype=np.int64)
+            return
+
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        # Pad by one cell on every side so that a neighbour offset can never wrap around into another row.
+        self._origin = cells.min(axis=0) - 1
+        extent = cells.max(axis=0) - self._origin + 2
+        if math.prod(int(length) for length in extent) >= 2 ** 63:
+            raise ValueError("Field is too large for this cell size, use a larger cell size.")
+        self._strides = np.array([extent[1] * extent[2], extent[2], 1], dtype=np.int64)
+
+        keys = (cells - self._origin) @ self._strides
+        self._order = np.argsort(keys, kind='stable')
+        self._cell_keys, self._cell_starts, self._cell_counts = np.unique(keys[self._order], return_index=True,
+                                                                          return_counts=True)
+
+    def _candidate_pairs(self):
+        """
+        Yield arrays of candidate index pairs for every cell and each of its neighbouring cells, one offset at a time.
+        :return: A generator of (first indices, second indices) array tuples.
+        """
+        for offset in [(0, 0, 0)] + _HALF_NEIGHBOURHOOD:
+            offset_key = int(np.dot(offset, self._strides))
+            if offset_key == 0:
+                first_cells = np.flatnonzero(self._cell_counts > 1)
+                second_cells = first_cells
+            else:
+                neighbour_keys = self._cell_keys + offset_key
+                located = np.searchsorted(self._cell_keys, neighbour_keys)
+                located[located == len(self._cell_keys)] = 0
+                first_cells = np.flatnonzero(self._cell_keys[located] == neighbour_keys)
+                second_cells = located[first_cells]
+            if len(first_cells) == 0:
+                continue
+
+            first_counts = self._cell_counts[first_cells]
+            second_counts = self._cell_counts[second_cells]
+            pair_counts = first_counts * second_counts
+            cell_pair = np.repeat(np.arange(len(first_cells)), pair_counts)
+            within = np.arange(int(pair_counts.sum())) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+            first_offsets = within // second_counts[cell_pair]
+            second_offsets = within % second_counts[cell_pair]
+            if offset_key == 0:
+                keep = first_offsets < second_offsets
+                cell_pair, first_offsets, second_offsets = cell_pair[keep], first_offsets[keep], second_offsets[keep]
+            yield (self._order[self._cell_starts[first_cells][cell_pair] + first_offsets],
+                   self._order[self._cell_starts[second_cells][cell_pair] + second_offsets])
+
+    def find_pairs(self, radii, margin=0.0):
+        """
+        Return every pair of bodies whose surfaces are within margin of each other, overlapping bodies included.
+
+        :precondition: The cell size must be at least the largest radius sum plus margin, and build() must have been
+        called with the positions of the bodies.
+        :param radii: An array of N radii, matching the positions passed to build().
+        :param margin: A non-negative number, 0 to find only touching or overlapping bodies.
+        :return: An M x 2 array of index pairs (i, j) with i < j, sorted.
+        """
+        radii = np.asarray(radii, dtype=np.float64)
+        found = []
+        for first, second in self._candidate_pairs():
+            reach = radii[first] + radii[second] + margin
+            distance_squared = np.square(self._positions[first] - self._positions[second]).sum(axis=1)
+            close = distance_squared <= reach * reach
+            found.append(np.stack([np.minimum(first[close], second[close]),
+                                   np.maximum(first[close], second[close])], axis=1))
+        if not found:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = np.concatenate(found)
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def neighbours(self, point, distance):
+        """
+        Return the indices of every bucketed position within distance of a point.
+
+        :precondition: distance must not be larger than the cell size.
+        :param point: A sequence of x y z coordinates.
+        :param distance: A non-negative number.
+        :return: A sorted array of indices.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        if len(self._cell_keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        cell = np.floor(point / self.cell_size).astype(np.int64) - self._origin
+        candidates = []
+        for offset in itertools.product((-1, 0, 1), repeat=3):
+            key = int(np.dot(cell + offset, self._strides))
+            located = np.searchsorted(self._cell_keys, key)
+            if located < len(self._cell_keys) and self._cell_keys[located] == key:
+                start = self._cell_starts[located]
+                candidates.append(self._order[start:start + self._cell_counts[located]])
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(candidates)
+        distance_squared = np.square(self._positions[candidates] - point).sum(axis=1)
+        return np.sort(candidates[distance_squared <= distance * distance])
+
+
+def find_colliding_pairs(positions, circumferences, margin=0.0, cell_size=None):
+    """
+    Return every pair of asteroids that overlap, or come within margin of each other, using a spatial hash grid.
+
+    :param positions: An N x 3 array of asteroid positions.
+    :param circumferences: An array of N asteroid circumferences.
+    :param margin: A non-negative number, the proximity distance between surfaces to report.
+    :param cell_size: A positive number, by default the largest possible reach between two asteroids.
+    :return: An M x 2 array of index pairs (i, j) with i < j, sorted.
+    """
+    radii = radii_from_circumferences(circumferences)
+    if len(radii) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    reach = 2 * float(radii.max()) + margin
+    if cell_size is None:
+        cell_size = reach if reach > 0 else 1.0
+    elif cell_size < reach:
+        raise ValueError("cell_size must be at least the largest radius sum plus margin")
+    grid = SpatialHashGrid(cell_size)
+    grid.build(positions)
+    return grid.find_pairs(radii, margin)
@@ -2,29 +2,48 @@
 
 
 from Lab.Lab2.asteroid import Asteroid
+from Lab.Lab2.asteroid_field import generate_random_field
+from Lab.Lab2.collision import find_colliding_pairs
+from Lab.Lab2.lookahead import first_approach_ticks, positions_at
+from Lab.Lab2.sharded_simulation import ShardedSimulation
+from Lab.Lab2.simulation_sinks import NullSink
 from datetime import datetime
 import time
 
+import numpy as np
+
 
 class Controller:
     """
     This class simulates 100 asteroids.
     """
-    def __init__(self):
+    def __init__(self, asteroid_count=100, vectorized=False, seed=None):
         """
-        Initialize a new Controller, and fills it with 100 randomly generated Asteroids.
+        Initialize a new Controller, and fills it with randomly generated Asteroids.
+
+        In vectorized mode the asteroids live in an AsteroidField, generated in bulk, and list_of_asteroids holds that
+        field, which can be indexed and iterated like a list of Asteroids.
+        :param asteroid_count: A positive integer, 100 by default.
+        :param vectorized: A boolean, True to store the asteroids in an AsteroidField.
+        :param seed: An integer seed for the vectorized field, or None for a different field every time.
         """
+        self.asteroid_field = None
         self.list_of_asteroids = []
-        i = 0
-        while i <= 99:
-            self.list_of_asteroids.append(Asteroid.generate_random_asteroid())
-            i += 1
+        if vectorized:
+            self.asteroid_field = generate_random_field(asteroid_count, seed)
+            self.list_of_asteroids = self.asteroid_field
+        else:
+            i = 0
+            while i < asteroid_count:
+                self.list_of_asteroids.append(Asteroid.generate_random_asteroid())
+                i += 1
 
-    def simulate(self, seconds: int):
+    def simulate(self, seconds: int, detect_collisions=False):
         """
         Simulate asteroid movement for all Asteroids once per second for specified amount of seconds.
 
         :param seconds: An integer greater than 0.
+        :param detect_collisions: A boolean, True to print the colliding asteroids after every second.
         :precondition: seconds must be an int greater than 0
         """
         print("Simulation Start Time: ", datetime.now())
@@ -32,12 +51,139 @@ class Controller:
         print("\n Moving Asteroids!\n -----------------")
         i = 0
         while i != seconds:
-            for asteroid in self.list_of_asteroids:
-                asteroid.move()
-                print(asteroid)
+            if self.asteroid_field is not None:
+                self.asteroid_field.move()
+                for asteroid in self.asteroid_field:
+                    print(asteroid)
+            else:
+                for asteroid in self.list_of_asteroids:
+                    asteroid.move()
+                    print(asteroid)
+            if detect_collisions:
+                for first_id, second_id in self.find_collisions().tolist():
+                    print(f"Collision! Asteroid {first_id} and Asteroid {second_id} are touching.")
             time.sleep(1)
             i += 1
 
+    def get_positions(self):
+        """
+        Return the positions of all asteroids.
+
+        :return: An N x 3 array, the live positions array when the controller is vectorized.
+        """
+        if self.asteroid_field is not None:
+            return self.asteroid_field.positions
+        return np.array([asteroid.position for asteroid in self.list_of_asteroids], dtype=np.float64).reshape(-1, 3)
+
+    def get_velocities(self):
+        """
+        Return the velocities of all asteroids.
+
+        :return: An N x 3 array, the live velocities array when the controller is vectorized.
+        """
+        if self.asteroid_field is not None:
+            return self.asteroid_field.velocities
+        return np.array([asteroid.velocity for asteroid in self.list_of_asteroids], dtype=np.float64).reshape(-1, 3)
+
+    def positions_at(self, ticks, dt=1.0):
+        """
+        Return the positions all asteroids will have after a number of ticks, without simulating them.
+
+        :param ticks: A non-negative integer.
+        :param dt: A positive number, the virtual seconds per tick.
+        :return: An N x 3 array of future positions.
+        """
+        return positions_at(self.get_positions(), self.get_velocities(), ticks, dt)
+
+    def find_first_approaches(self, index, threshold, dt=1.0, max_tick=None):
+        """
+        Return the earliest tick at which every asteroid comes within threshold of the asteroid at index.
+
+        :param index: An integer index into list_of_asteroids.
+        :param threshold: A non-negative number, the distance between centres to look for.
+        :param dt: A positive number, the virtual seconds per tick.
+        :param max_tick: An integer, ticks after it are reported as never, or None for no limit.
+        :return: An array of N integer ticks, -1 for never and for the asteroid itself.
+        """
+        positions = self.get_positions()
+        velocities = self.get_velocities()
+        ticks = first_approach_ticks(positions[index], velocities[index], positions, velocities, threshold, dt,
+                                     max_tick)
+        ticks[index] = -1
+        return ticks
+
+    def get_circumferences(self):
+        """
+        Return the circumferences of all asteroids.
+
+        :return: An array of N circumferences.
+        """
+        if self.asteroid_field is not None:
+            return self.asteroid_field.circumferences
+        return np.array([asteroid.circumference for asteroid in self.list_of_asteroids], dtype=np.float64)
+
+    def get_ids(self):
+        """
+        Return the ids of all asteroids.
+
+        :return: An array of N ids.
+        """
+        if self.asteroid_field is not None:
+            return self.asteroid_field.ids
+        return np.array([asteroid.get_id() for asteroid in self.list_of_asteroids], dtype=np.int64)
+
+    def find_collisions(self, margin=0.0):
+        """
+        Return the ids of every pair of asteroids that overlap or whose surfaces are within margin of each other.
+
+        :param margin: A non-negative number, 0 to find only touching or overlapping asteroids.
+        :return: An M x 2 array of asteroid id pairs.
+        """
+        pairs = find_colliding_pairs(self.get_positions(), self.get_circumferences(), margin)
+        return self.get_ids()[pairs]
+
+    def run_headless(self, ticks: int, dt=1.0, sink=None, detect_collisions=False, margin=0.0, workers=1):
+        """
+        Simulate asteroid movement for a number of fixed size ticks as fast as possible, without sleeping or printing.
+
+        Every tick moves all asteroids by dt virtual seconds and hands the new positions to the sink, followed by the
+        colliding asteroid id pairs when collision detection is on.
+        :param ticks: An integer greater than or equal to 0.
+        :param dt: A positive number, the virtual seconds per tick.
+        :param sink: A SimulationSink, a NullSink by default.
+        :param detect_collisions: A boolean, True to report colliding pairs to the sink every tick.
+        :param margin: A non-negative number, the proximity distance between surfaces that counts as a collision.
+        :param workers: A positive integer, more than 1 to shard a vectorized field across that many processes.
+        :precondition: ticks must be an int greater than or equal to 0
+        :return: The total virtual time simulated in seconds.
+        """
+        if sink is None:
+            sink = NullSink()
+        if workers > 1:
+            if self.asteroid_field is None:
+                raise ValueError("Only a vectorized Controller can be run across several workers.")
+
+            def report_collisions(tick, positions):
+                pairs = find_colliding_pairs(positions, self.asteroid_field.circumferences, margin)
+                sink.record_collisions(tick, self.asteroid_field.ids[pairs])
+
+            return ShardedSimulation(self.asteroid_field, workers).run(
+                ticks, dt, sink, report_collisions if detect_collisions else None)
+        sink.open(len(self.list_of_asteroids))
+        try:
+            for tick in range(1, ticks + 1):
+                if self.asteroid_field is not None:
+                    self.asteroid_field.move(dt)
+                else:
+                    for asteroid in self.list_of_asteroids:
+                        asteroid.move(dt, verbose=False)
+                sink.record(tick, tick * dt, self.get_positions())
+                if detect_collisions:
+                    sink.record_collisions(tick, self.find_collisions(margin))
+        finally:
+            sink.close()
+        return ticks * dt
+
 
 def main():
     controller = Controller()
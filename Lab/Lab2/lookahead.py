@@ -0,0 +1,63 @@
+"""This module implements closed-form lookahead queries for asteroids moving at constant velocity."""
+
+
+import numpy as np
+
+
+def positions_at(positions, velocities, ticks, dt=1.0):
+    """
+    Return the positions after a number of ticks, computed directly instead of moving tick by tick.
+
+    The result equals repeated moves exactly for integer positions and velocities, and to within rounding otherwise.
+    :param positions: An N x 3 array of current positions.
+    :param velocities: An N x 3 array of velocities.
+    :param ticks: A non-negative integer.
+    :param dt: A positive number, the virtual seconds per tick.
+    :return: An N x 3 array of future positions.
+    """
+    return np.asarray(positions, dtype=np.float64) + np.asarray(velocities, dtype=np.float64) * (ticks * dt)
+
+
+def first_approach_ticks(first_positions, first_velocities, second_positions, second_velocities, threshold,
+                         dt=1.0, max_tick=None):
+    """
+    Return the earliest tick at which each pair of bodies is within threshold of each other, for a batch of pairs.
+
+    The squared distance between two bodies moving at constant velocity is a quadratic in time, so the time interval
+    during which they are within threshold is found from its roots, and the earliest tick inside it is rounded up from
+    the start of the interval. Tick 0 is the current position. The arguments broadcast against each other, so one body
+    can be checked against a whole field.
+    :param first_positions: An N x 3 array of positions.
+    :param first_velocities: An N x 3 array of velocities.
+    :param second_positions: An N x 3 array of positions.
+    :param second_velocities: An N x 3 array of velocities.
+    :param threshold: A non-negative number or array of N numbers, the distance between centres to look for.
+    :param dt: A positive number, the virtual seconds per tick.
+    :param max_tick: An integer, ticks after it are reported as never, or None for no limit.
+    :return: An array of N integer ticks, -1 where the pair never comes within threshold.
+    """
+    relative_positions = np.asarray(second_positions, dtype=np.float64) - np.asarray(first_positions, dtype=np.float64)
+    relative_velocities = (np.asarray(second_velocities, dtype=np.float64)
+                           - np.asarray(first_velocities, dtype=np.float64))
+    threshold = np.asarray(threshold, dtype=np.float64)
+
+    # |p + v t|^2 <= threshold^2  <=>  a t^2 + b t + c <= 0
+    a = np.einsum('...i,...i->...', relative_velocities, relative_velocities)
+    b = 2 * np.einsum('...i,...i->...', relative_positions, relative_velocities)
+    c = np.einsum('...i,...i->...', relative_positions, relative_positions) - threshold * threshold
+    a, b, c = np.broadcast_arrays(a, b, c)
+    discriminant = b * b - 4 * a * c
+
+    ticks = np.full(a.shape, -1, dtype=np.int64)
+    ticks[c <= 0] = 0
+    moving = (c > 0) & (a > 0) & (discriminant >= 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        root = np.sqrt(np.where(moving, discriminant, 0.0))
+        enter = np.where(moving, (-b - root) / (2 * a), 0.0)
+        leave = np.where(moving, (-b + root) / (2 * a), -1.0)
+    first_tick = np.ceil(np.maximum(enter, 0.0) / dt)
+    approaching = moving & (first_tick * dt <= leave)
+    if max_tick is not None:
+        approaching &= first_tick <= max_tick
+    ticks[approaching] = first_tick[approaching].astype(np.int64)
+    return ticks
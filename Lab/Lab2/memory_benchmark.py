@@ -0,0 +1,71 @@
+"""This module benchmarks the memory used per asteroid and the creation rate of the asteroid representations."""
+
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from Lab.Lab2.asteroid import Asteroid
+from Lab.Lab2.asteroid_field import AsteroidField, generate_random_field
+
+
+def measure(label, build, count):
+    """
+    Build count asteroids with the given function and print the bytes per asteroid and asteroids created per second.
+
+    :param label: A string naming the representation.
+    :param build: A function taking count and returning an object that keeps all the asteroids alive.
+    :param count: A positive integer.
+    :return: A tuple of bytes per asteroid and asteroids per second.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    asteroids = build(count)
+    elapsed = time.perf_counter() - start_time
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del asteroids
+
+    bytes_per_asteroid = allocated / count
+    # tracemalloc slows allocation down, so the creation rate is timed again without it.
+    gc.collect()
+    start_time = time.perf_counter()
+    asteroids = build(count)
+    elapsed = min(elapsed, time.perf_counter() - start_time)
+    del asteroids
+    asteroids_per_second = count / elapsed
+    print(f"{label:<40} {bytes_per_asteroid:>10.1f} bytes/asteroid {asteroids_per_second:>14,.0f} asteroids/s")
+    return bytes_per_asteroid, asteroids_per_second
+
+
+def build_asteroid_list(count):
+    """
+    :param count: A positive integer.
+    :return: A list of count random Asteroid instances.
+    """
+    return [Asteroid.generate_random_asteroid() for _ in range(count)]
+
+
+def build_asteroid_field(count):
+    """
+    :param count: A positive integer.
+    :return: An AsteroidField of count random asteroids.
+    """
+    return AsteroidField.from_asteroids(build_asteroid_list(count))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1_000_000,
+                        help="The number of asteroids to create, 1,000,000 by default.")
+    args = parser.parse_args()
+    print(f"Creating {args.count:,} asteroids")
+    measure("Asteroid.generate_random_asteroid()", build_asteroid_list, args.count)
+    measure("AsteroidField.from_asteroids()", build_asteroid_field, args.count)
+    measure("generate_random_field()", generate_random_field, args.count)
+
+
+if __name__ == "__main__":
+    main()
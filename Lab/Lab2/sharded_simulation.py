@@ -0,0 +1,117 @@
+"""This module implements a multi-process, sharded runner for an AsteroidField."""
+
+
+from multiprocessing import Pool, shared_memory
+import os
+
+import numpy as np
+
+from Lab.Lab2.simulation_sinks import NullSink
+
+# The shared arrays a worker process attached to in _attach_worker.
+_worker_state = {}
+
+
+def _attach_worker(positions_name, velocities_name, asteroid_count):
+    """
+    Pool initializer, attaches the worker process to the shared position and velocity arrays.
+    :param positions_name: The name of the shared memory block holding positions.
+    :param velocities_name: The name of the shared memory block holding velocities.
+    :param asteroid_count: The number of asteroids in the field.
+    """
+    positions_memory = shared_memory.SharedMemory(name=positions_name)
+    velocities_memory = shared_memory.SharedMemory(name=velocities_name)
+    _worker_state["memory"] = (positions_memory, velocities_memory)
+    _worker_state["positions"] = np.ndarray((asteroid_count, 3), dtype=np.float64, buffer=positions_memory.buf)
+    _worker_state["velocities"] = np.ndarray((asteroid_count, 3), dtype=np.float64, buffer=velocities_memory.buf)
+
+
+def _advance_shard(task):
+    """
+    Move the asteroids of one shard for a number of ticks, using exactly the arithmetic of AsteroidField.move.
+    :param task: A tuple of (start index, stop index, dt, ticks).
+    :return: The start index of the shard.
+    """
+    start, stop, dt, ticks = task
+    positions = _worker_state["positions"][start:stop]
+    velocities = _worker_state["velocities"][start:stop]
+    for _ in range(ticks):
+        if dt == 1:
+            positions += velocities
+        else:
+            positions += velocities * dt
+    return start
+
+
+class ShardedSimulation:
+    """
+    Runs an AsteroidField across several worker processes that share the field's arrays.
+
+    The field is split into contiguous index shards. Every tick each worker moves its shard in place in shared
+    memory, and the parent process waits for all shards before handing the merged positions to the sink. Each
+    asteroid is moved with the same operations as in AsteroidField.move, so results are bit-identical to a single
+    process run.
+    """
+
+    def __init__(self, field, workers=None):
+        """
+        :param field: The AsteroidField to simulate, its positions are updated when a run finishes.
+        :param workers: A positive integer, the number of worker processes, the CPU count by default.
+        """
+        self.field = field
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+
+    def shard_bounds(self):
+        """
+        Return the index range of every shard, one shard per worker.
+        :return: A list of (start, stop) tuples.
+        """
+        edges = np.linspace(0, len(self.field), self.workers + 1).astype(np.int64)
+        return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+    def run(self, ticks: int, dt=1.0, sink=None, on_tick=None):
+        """
+        Move the field for a number of fixed size ticks in the worker processes.
+
+        Without a sink or tick callback every shard runs all its ticks in one go, otherwise the workers are
+        synchronised after every tick.
+        :param ticks: An integer greater than or equal to 0.
+        :param dt: A positive number, the virtual seconds per tick.
+        :param sink: A SimulationSink, or None.
+        :param on_tick: A function called as on_tick(tick, positions) after the sink, or None.
+        :precondition: ticks must be an int greater than or equal to 0
+        :return: The total virtual time simulated in seconds.
+        """
+        asteroid_count = len(self.field)
+        per_tick = not (sink is None or isinstance(sink, NullSink)) or on_tick is not None
+        if sink is None:
+            sink = NullSink()
+        positions_memory = shared_memory.SharedMemory(create=True, size=max(self.field.positions.nbytes, 1))
+        velocities_memory = shared_memory.SharedMemory(create=True, size=max(self.field.velocities.nbytes, 1))
+        try:
+            positions = np.ndarray((asteroid_count, 3), dtype=np.float64, buffer=positions_memory.buf)
+            velocities = np.ndarray((asteroid_count, 3), dtype=np.float64, buffer=velocities_memory.buf)
+            positions[:] = self.field.positions
+            velocities[:] = self.field.velocities
+            sink.open(asteroid_count)
+            try:
+                with Pool(self.workers, initializer=_attach_worker,
+                          initargs=(positions_memory.name, velocities_memory.name, asteroid_count)) as pool:
+                    if per_tick:
+                        for tick in range(1, ticks + 1):
+                            pool.map(_advance_shard, [(start, stop, dt, 1) for start, stop in self.shard_bounds()])
+                            sink.record(tick, tick * dt, positions)
+                            if on_tick is not None:
+                                on_tick(tick, positions)
+                    elif ticks:
+                        pool.map(_advance_shard, [(start, stop, dt, ticks) for start, stop in self.shard_bounds()])
+            finally:
+                sink.close()
+            self.field.positions[:] = positions
+            del positions, velocities
+        finally:
+            positions_memory.close()
+            positions_memory.unlink()
+            velocities_memory.close()
+            velocities_memory.unlink()
+        return ticks * dt
@@ -0,0 +1,111 @@
+"""This module implements the sinks a headless Controller simulation writes its results to."""
+
+
+import abc
+import sys
+
+import numpy as np
+
+from Lab.Lab2.trajectory import TrajectoryWriter
+
+
+class SimulationSink(abc.ABC):
+    """
+    Baseclass for all sinks that receive the asteroid positions of a headless simulation once per tick.
+    """
+
+    def open(self, asteroid_count):
+        """
+        Called once before the first tick.
+        :param asteroid_count: The number of asteroids being simulated.
+        """
+        pass
+
+    @abc.abstractmethod
+    def record(self, tick, virtual_time, positions):
+        """
+        Each sink's specific handling of one tick.
+        :param tick: The tick number, starting with 1.
+        :param virtual_time: The simulated time in seconds after this tick.
+        :param positions: An N x 3 array of asteroid positions. Sinks must copy it if they keep it.
+        """
+        pass
+
+    def record_collisions(self, tick, id_pairs):
+        """
+        Called after record() on ticks where collision detection ran.
+        :param tick: The tick number, starting with 1.
+        :param id_pairs: An M x 2 array of the ids of colliding asteroids.
+        """
+        pass
+
+    def close(self):
+        """
+        Called once after the last tick.
+        """
+        pass
+
+
+class NullSink(SimulationSink):
+    """
+    A sink that discards every tick, for when only the final state of the simulation matters.
+    """
+
+    def record(self, tick, virtual_time, positions):
+        pass
+
+
+class SampledLogSink(SimulationSink):
+    """
+    A sink that writes a one line summary of the field every sample_interval ticks, with the first few asteroids.
+    """
+
+    def __init__(self, sample_interval=100, asteroids_shown=3, stream=None):
+        """
+        :param sample_interval: A positive integer, the number of ticks between log lines.
+        :param asteroids_shown: A non-negative integer, the number of asteroid positions to include in each line.
+        :param stream: A writable text stream, sys.stdout by default.
+        """
+        self.sample_interval = sample_interval
+        self.asteroids_shown = asteroids_shown
+        self.stream = stream
+
+    def record(self, tick, virtual_time, positions):
+        if tick % self.sample_interval:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        shown = [tuple(position) for position in positions[:self.asteroids_shown].tolist()]
+        stream.write(f"Tick {tick} (t={virtual_time:g}s): {len(positions)} asteroids, "
+                     f"centroid {tuple(positions.mean(axis=0).tolist())}, first positions {shown}\n")
+
+    def record_collisions(self, tick, id_pairs):
+        if tick % self.sample_interval:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(f"Tick {tick}: {len(id_pairs)} colliding pairs {id_pairs[:self.asteroids_shown].tolist()}\n")
+
+
+class BinaryTrajectorySink(SimulationSink):
+    """
+    A sink that records every tick's positions to a memory-mapped trajectory file, see TrajectoryReader.
+    """
+
+    def __init__(self, path, dtype=np.float64):
+        """
+        :param path: The path of the file to write, it is overwritten if it exists.
+        :param dtype: The numpy dtype to store positions as, float64 by default.
+        """
+        self.path = path
+        self.dtype = dtype
+        self._writer = None
+
+    def open(self, asteroid_count):
+        self._writer = TrajectoryWriter(self.path, asteroid_count, self.dtype)
+
+    def record(self, tick, virtual_time, positions):
+        self._writer.append(positions)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,174 @@
+"""This module implements a memory-mapped binary trajectory file for recording and reading asteroid runs."""
+
+
+import os
+import struct
+
+import numpy as np
+
+# File layout: the header below, then one N x 3 frame of positions per tick in C order.
+# The header holds a magic string, the number of asteroids N, the number of ticks and the numpy dtype string.
+MAGIC = b"ASTTRAJ1"
+HEADER_FORMAT = "<8sQQ8s"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+def _write_header(trajectory_file, asteroid_count, ticks, dtype):
+    """
+    Write the trajectory header at the start of an open binary file.
+    :param trajectory_file: A file opened for binary writing.
+    :param asteroid_count: The number of asteroids per tick.
+    :param ticks: The number of ticks recorded.
+    :param dtype: The numpy dtype of the positions.
+    """
+    trajectory_file.seek(0)
+    trajectory_file.write(struct.pack(HEADER_FORMAT, MAGIC, asteroid_count, ticks, dtype.str.encode('ascii')))
+
+
+class TrajectoryWriter:
+    """
+    Appends per-tick position snapshots to a trajectory file through a memory map.
+
+    The file is grown in doubling steps, so appending a tick is a copy into mapped memory. The header's tick count is
+    written and the file trimmed to its exact size when the writer is closed.
+    """
+
+    def __init__(self, path, asteroid_count, dtype=np.float64, initial_capacity=64):
+        """
+        Create or overwrite a trajectory file.
+        :param path: The path of the file to write.
+        :param asteroid_count: A non-negative integer, the number of asteroids in every snapshot.
+        :param dtype: The numpy dtype to store positions as, float64 by default.
+        :param initial_capacity: A positive integer, the number of ticks to make room for up front.
+        """
+        self.path = path
+        self.asteroid_count = asteroid_count
+        self.dtype = np.dtype(dtype)
+        self.ticks = 0
+        self._capacity = 0
+        self._frames = None
+        self._frame_size = asteroid_count * 3 * self.dtype.itemsize
+        self._file = open(path, mode='w+b')
+        _write_header(self._file, asteroid_count, 0, self.dtype)
+        self._grow(max(initial_capacity, 1))
+
+    def _grow(self, capacity):
+        """
+        Extend the file to hold capacity ticks and map the frames again.
+        :param capacity: A positive integer larger than the current capacity.
+        """
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+        self._file.truncate(HEADER_SIZE + capacity * self._frame_size)
+        self._file.flush()
+        self._capacity = capacity
+        if self._frame_size:
+            self._frames = np.memmap(self._file, dtype=self.dtype, mode='r+', offset=HEADER_SIZE,
+                                     shape=(capacity, self.asteroid_count, 3))
+
+    def append(self, positions):
+        """
+        Record the positions of every asteroid for the next tick.
+        :param positions: An N x 3 array of positions.
+        """
+        if self.ticks == self._capacity:
+            self._grow(self._capacity * 2)
+        if self._frames is not None:
+            self._frames[self.ticks] = positions
+        self.ticks += 1
+
+    def close(self):
+        """
+        Flush the recorded ticks, write the final header and trim the file.
+        """
+        if self._file is None:
+            return
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+        self._file.truncate(HEADER_SIZE + self.ticks * self._frame_size)
+        _write_header(self._file, self.asteroid_count, self.ticks, self.dtype)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Gives random access to any tick or any asteroid's path in a trajectory file through a read-only memory map.
+
+    Only the pages that are actually read are loaded, so single ticks or paths can be read from files far larger than
+    memory.
+    """
+
+    def __init__(self, path):
+        """
+        Open a trajectory file written by TrajectoryWriter.
+        :param path: The path of the file to read.
+        :raise ValueError: if the file is not a complete trajectory file.
+        """
+        self.path = path
+        with open(path, mode='rb') as trajectory_file:
+            header = trajectory_file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a trajectory file.")
+        magic, self.asteroid_count, self.ticks, dtype = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a trajectory file.")
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode('ascii'))
+        expected_size = HEADER_SIZE + self.ticks * self.asteroid_count * 3 * self.dtype.itemsize
+        if os.path.getsize(path) < expected_size:
+            raise ValueError(f"{path} is truncated, it should hold {self.ticks} ticks.")
+        if expected_size > HEADER_SIZE:
+            self._frames = np.memmap(path, dtype=self.dtype, mode='r', offset=HEADER_SIZE,
+                                     shape=(self.ticks, self.asteroid_count, 3))
+        else:
+            self._frames = np.empty((self.ticks, self.asteroid_count, 3), dtype=self.dtype)
+
+    def __len__(self):
+        """
+        :return: The number of ticks recorded.
+        """
+        return self.ticks
+
+    def get_tick(self, tick):
+        """
+        Return the positions of every asteroid after a tick.
+        :param tick: An integer from 1 to the number of ticks recorded.
+        :return: An N x 3 read-only array.
+        """
+        if not 1 <= tick <= self.ticks:
+            raise IndexError(f"tick must be between 1 and {self.ticks}")
+        return self._frames[tick - 1]
+
+    def get_path(self, index, first_tick=1, last_tick=None):
+        """
+        Return the positions of one asteroid over a range of ticks.
+        :param index: An integer index of the asteroid in the recorded field.
+        :param first_tick: An integer, the first tick of the path, 1 by default.
+        :param last_tick: An integer, the last tick of the path, the last recorded tick by default.
+        :return: A T x 3 array with one row per tick.
+        """
+        if not 0 <= index < self.asteroid_count:
+            raise IndexError("asteroid index out of range")
+        if last_tick is None:
+            last_tick = self.ticks
+        return np.array(self._frames[first_tick - 1:last_tick, index])
+
+    def close(self):
+        """
+        Release the memory map.
+        """
+        self._frames = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
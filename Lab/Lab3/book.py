@@ -1,4 +1,4 @@
-from libraryitem import LibraryItem
+from libraryitem import LibraryItem, intern_field
 
 
 class Book(LibraryItem):
@@ -6,6 +6,7 @@ class Book(LibraryItem):
     Represents a single book in a library which is identified through
     it's call number.
     """
+    __slots__ = ("_author",)
 
     def __init__(self, call_num, title, num_copies, author):
         """
@@ -16,7 +17,7 @@ class Book(LibraryItem):
         :precondition call_num: a unique identifier
         :precondition num_copies: a positive integer
         """
-        self._author = author
+        self._author = intern_field(author)
         super().__init__(call_num, title, num_copies)
 
     def __str__(self):
@@ -0,0 +1,173 @@
+"""
+module containing the non-interactive bulk import of library items
+from CSV and JSON Lines files.
+"""
+import argparse
+import csv
+import json
+from pathlib import Path
+
+from catalogue import Catalogue
+from cataloguestore import ITEM_KINDS, CatalogueStore
+
+# fields every record needs, whatever its kind
+COMMON_FIELDS = ("call_number", "title", "num_copies")
+
+
+class InvalidRecordError(Exception):
+    def __init__(self, my_msg):
+        super().__init__(my_msg)
+
+
+class ImportReport:
+    """
+    Counts of what happened to the records of an import.
+    """
+
+    def __init__(self):
+        self.added = 0
+        self.duplicates = []
+        self.invalid = []
+
+    def __str__(self):
+        return f"Added {self.added} items, skipped " \
+               f"{len(self.duplicates)} duplicate call numbers and " \
+               f"{len(self.invalid)} invalid records."
+
+
+def read_records(path):
+    """
+    Yields the records of a CSV or JSON Lines file one at a time, with
+    their line numbers. CSV files need a header row naming the fields.
+    :param path: a string, a .csv, .jsonl or .ndjson file
+    :return: a generator of (line number, dict) tuples
+    """
+    extension = Path(path).suffix.lower()
+    with open(path, mode='r', encoding='utf-8', newline='') as data_file:
+        if extension == ".csv":
+            reader = csv.DictReader(data_file)
+            for record in reader:
+                yield reader.line_num, record
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(data_file, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield line_number, InvalidRecordError(str(error))
+        else:
+            raise InvalidRecordError(f"File type {extension} is not "
+                                     f"supported, use .csv or .jsonl")
+
+
+def build_library_item_from_record(record):
+    """
+    Return the book, dvd or journal described by a record. The record's
+    "type" field names the kind, the other fields are named after the
+    constructor parameters, for example "author" for a book.
+    :param record: a dict
+    :return: A library item
+    """
+    if not isinstance(record, dict):
+        raise InvalidRecordError("Record is not an object")
+    kind = str(record.get("type", "")).strip().lower()
+    if kind not in ITEM_KINDS:
+        raise InvalidRecordError(f"Unknown item type {kind!r}, expected "
+                                 f"one of {', '.join(ITEM_KINDS)}")
+    item_class, attributes = ITEM_KINDS[kind]
+    fields = COMMON_FIELDS + tuple(name.lstrip("_") for name in attributes)
+    missing = [field for field in fields if record.get(field) in (None, "")]
+    if missing:
+        raise InvalidRecordError(f"Missing {', '.join(missing)}")
+    # JSON Lines records may hold numbers, which are stored as their
+    # text, but lists, objects and Booleans are not valid field values
+    not_scalar = [field for field in fields
+                  if isinstance(record[field], bool) or
+                  not isinstance(record[field], (str, int, float))]
+    if not_scalar:
+        raise InvalidRecordError(f"{', '.join(not_scalar)} must be text "
+                                 f"or a number")
+    num_copies = _parse_num_copies(record["num_copies"])
+    return item_class(str(record["call_number"]), str(record["title"]),
+                      num_copies, *(str(record[field])
+                                    for field in fields[3:]))
+
+
+def _parse_num_copies(value):
+    """
+    Return the number of copies in a record, which must be a whole,
+    non-negative number. Values such as 2.7 and "2.7" are rejected
+    rather than rounded.
+    :param value: a string or number
+    :return: an int
+    """
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise InvalidRecordError("num_copies is not a whole number")
+    try:
+        num_copies = int(value)
+    except (TypeError, ValueError):
+        raise InvalidRecordError("num_copies is not a whole number")
+    if num_copies < 0:
+        raise InvalidRecordError("num_copies is negative")
+    return num_copies
+
+
+def import_library_items(catalogue, path, batch_size=10000):
+    """
+    Stream the records of a file into a catalogue in batches, skipping
+    invalid records and call numbers the catalogue already has.
+    :param catalogue: a Catalogue
+    :param path: a string, a .csv or .jsonl file
+    :param batch_size: a positive int, the items added at a time
+    :return: an ImportReport
+    """
+    report = ImportReport()
+    batch = []
+    for line_number, record in read_records(path):
+        try:
+            if isinstance(record, InvalidRecordError):
+                raise record
+            batch.append(build_library_item_from_record(record))
+        except InvalidRecordError as error:
+            report.invalid.append((line_number, str(error)))
+            continue
+        if len(batch) >= batch_size:
+            _add_batch(catalogue, batch, report)
+            batch = []
+    _add_batch(catalogue, batch, report)
+    return report
+
+
+def _add_batch(catalogue, batch, report):
+    rejected = catalogue.add_library_items(batch)
+    report.added += len(batch) - len(rejected)
+    report.duplicates.extend(library_item.call_number
+                             for library_item in rejected)
+
+
+def main():
+    """
+    Imports a file of library items into a catalogue database.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", help="A .csv or .jsonl file of items.")
+    parser.add_argument("-d", "--database", required=True,
+                        help="The SQLite catalogue file to import into.")
+    parser.add_argument("-b", "--batch-size", type=int, default=10000,
+                        help="The number of items written per transaction.")
+    args = parser.parse_args()
+
+    store = CatalogueStore(args.database)
+    try:
+        report = import_library_items(Catalogue([], store), args.file,
+                                      args.batch_size)
+    finally:
+        store.close()
+    print(report)
+    for line_number, message in report.invalid[:20]:
+        print(f"Line {line_number}: {message}")
+
+
+if __name__ == '__main__':
+    main()
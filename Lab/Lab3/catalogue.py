@@ -1,25 +1,394 @@
 """ This modules houses the catalogue"""
-import difflib
+import contextlib
+import enum
+import json
+import threading
+from collections import Counter
+
+from cataloguestore import ITEM_KINDS
+from fieldindex import EqualityIndex, RangeIndex, parse_release_date
+from libraryitem import normalize_title
 from libraryitemgenerator import LibraryItemGenerator
+from listingindex import ListingIndex
+from titleindex import TitleIndex
+
+
+# the fields that can be queried, with the kind of item that has them,
+# its attribute and a function making the field's index
+INDEXED_FIELDS = {
+    "author": ("book", "_author", EqualityIndex),
+    "names": ("journal", "_names", lambda: EqualityIndex(separator=",")),
+    "publisher": ("journal", "_publisher", EqualityIndex),
+    "release_date": ("dvd", "_release_date",
+                     lambda: RangeIndex(parse_release_date)),
+}
+
+
+class CheckoutStatus(enum.Enum):
+    """
+    The outcomes of checking out a library item.
+    """
+    COMPLETE = "complete"
+    NOT_FOUND = "not found"
+    UNAVAILABLE = "unavailable"
 
 
 class Catalogue:
     """
-    Class representing a catalogue of library items
+    Class representing a catalogue of library items. Copy counts are
+    changed under a per call number lock, so the catalogue can be used
+    from many threads at once.
     """
-    def __init__(self, item_list):
+
+    # the number of locks copy count changes are spread over
+    LOCK_STRIPES = 256
+
+    def __init__(self, item_list, store=None):
         """
         Initialize the library with a list of library items.
+
+        With a store, the catalogue holds every item in the store and
+        only builds the items it is asked for, and items in item_list
+        are added to the store if their call number is not in it yet.
         :param item_list: a sequence of library item objects.
+        :param store: a CatalogueStore, or None to keep items in memory.
+        """
+        # library items keyed by call number, in the order they were
+        # added. With a store, only the items built so far.
+        self._library_items = {}
+        self._store = store
+        self._title_index = None
+        self._listing_index = None
+        self._field_indexes = None
+        # guards adding and removing items and building indexes
+        self._structure_lock = threading.RLock()
+        self._copy_locks = [threading.Lock()
+                            for _ in range(self.LOCK_STRIPES)]
+        new_library_items = []
+        for library_item in item_list:
+            if not self._contains(library_item.call_number):
+                self._library_items[library_item.call_number] = library_item
+                new_library_items.append(library_item)
+        if self._store is not None:
+            self._store.save_many(new_library_items)
+
+    @staticmethod
+    def item_kind(library_item):
+        """
+        Return the kind of a library item, such as "book" or "dvd".
+        :param library_item: a library item object
+        :return: a string
+        """
+        return type(library_item).__name__.lower()
+
+    def _contains(self, call_number):
+        """
+        Return True if an item with the call number is in the catalogue.
+        :param call_number: a string
+        :return: a Boolean
+        """
+        if call_number in self._library_items:
+            return True
+        return self._store is not None and call_number in self._store
+
+    def _copy_lock(self, call_number):
+        """
+        Return the lock guarding the copy count of a call number.
+        :param call_number: a string
+        :return: a Lock
+        """
+        return self._copy_locks[hash(call_number) % self.LOCK_STRIPES]
+
+    @contextlib.contextmanager
+    def _holding_copy_locks(self, call_numbers):
+        """
+        Hold the locks guarding the copy counts of several call numbers,
+        always taken in the same order so batches cannot deadlock.
+        :param call_numbers: an iterable of strings
+        """
+        stripes = sorted({hash(call_number) % self.LOCK_STRIPES
+                          for call_number in call_numbers})
+        with contextlib.ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._copy_locks[stripe])
+            yield
+
+    def _insert_library_item(self, library_item):
+        """
+        Add an item with a new call number to the catalogue, its store
+        and its indexes.
+        :param library_item: a library item object
+        """
+        with self._structure_lock:
+            self._library_items[library_item.call_number] = library_item
+            if self._store is not None:
+                self._store.save(library_item)
+            if self._title_index is not None:
+                self._title_index.add(library_item.call_number,
+                                      library_item.get_title(),
+                                      library_item.get_search_key())
+            if self._listing_index is not None:
+                self._listing_index.add(library_item.call_number,
+                                        self.item_kind(library_item),
+                                        library_item.check_availability())
+            if self._field_indexes is not None:
+                for field, value in self._indexed_values(library_item):
+                    self._field_indexes[field].add(library_item.call_number,
+                                                   value)
+
+    def _delete_library_item(self, library_item):
+        """
+        Remove an item from the catalogue, its store and its indexes.
+        :param library_item: a library item object in the catalogue
+        """
+        call_number = library_item.call_number
+        with self._structure_lock:
+            self._library_items.pop(call_number, None)
+            if self._store is not None:
+                self._store.delete(call_number)
+            if self._title_index is not None:
+                self._title_index.remove(call_number)
+            if self._listing_index is not None:
+                self._listing_index.remove(call_number,
+                                           self.item_kind(library_item),
+                                           library_item.check_availability())
+            if self._field_indexes is not None:
+                for field, value in self._indexed_values(library_item):
+                    self._field_indexes[field].remove(call_number, value)
+
+    def _update_availability(self, library_item, was_available):
+        """
+        Move an item between the available and unavailable listings if
+        a change to its copies changed its availability. Called while
+        holding the item's copy lock.
+        :param library_item: a library item object
+        :param was_available: a Boolean, the availability before
+        """
+        if self._listing_index is not None and \
+                library_item.check_availability() != was_available:
+            self._listing_index.set_available(library_item.call_number,
+                                              self.item_kind(library_item),
+                                              not was_available)
+
+    def _save_num_copies(self, library_item):
+        """
+        Write a changed number of copies through to the store.
+        :param library_item: a library item object
+        """
+        if self._store is not None:
+            self._store.update_num_copies(library_item.call_number,
+                                          library_item.get_num_copies())
+
+    def _save_num_copies_many(self, library_items):
+        """
+        Write the changed numbers of copies of several items through to
+        the store in one transaction.
+        :param library_items: an iterable of library item objects
+        """
+        if self._store is not None:
+            self._store.update_num_copies_many(
+                (library_item.call_number, library_item.get_num_copies())
+                for library_item in library_items)
+
+    def _get_title_index(self):
+        """
+        Return the title index, building it on first use. With a store
+        only the titles are read, not whole items.
+        :return: a TitleIndex
+        """
+        with self._structure_lock:
+            if self._title_index is None:
+                title_index = TitleIndex()
+                if self._store is not None:
+                    for call_number, title in self._store.iter_titles():
+                        title_index.add(call_number, *normalize_title(title))
+                else:
+                    for library_item in self._library_items.values():
+                        title_index.add(library_item.call_number,
+                                        library_item.get_title(),
+                                        library_item.get_search_key())
+                self._title_index = title_index
+            return self._title_index
+
+    def _get_listing_index(self):
+        """
+        Return the listing index, building it on first use. With a store
+        only the call numbers, kinds and copy counts are read.
+        :return: a ListingIndex
+        """
+        with self._structure_lock:
+            if self._listing_index is None:
+                listing_index = ListingIndex()
+                if self._store is not None:
+                    listing_index.add_many(
+                        (call_number, kind, num_copies > 0)
+                        for call_number, kind, num_copies
+                        in self._store.iter_rows("call_number, kind, "
+                                                 "num_copies"))
+                else:
+                    listing_index.add_many(
+                        (library_item.call_number, self.item_kind(library_item),
+                         library_item.check_availability())
+                        for library_item in self._library_items.values())
+                self._listing_index = listing_index
+            return self._listing_index
+
+    @classmethod
+    def _indexed_values(cls, library_item):
+        """
+        Return the values of a library item's indexed fields.
+        :param library_item: a library item object
+        :return: a list of (field, value) tuples
+        """
+        kind = cls.item_kind(library_item)
+        return [(field, getattr(library_item, attribute))
+                for field, (field_kind, attribute, _)
+                in INDEXED_FIELDS.items() if field_kind == kind]
+
+    def _get_field_indexes(self):
+        """
+        Return the indexes of the queryable fields, building them on
+        first use. With a store the field values are read from the rows
+        without building the items.
+        :return: a dict of field names to EqualityIndex and RangeIndex
         """
-        self._library_item_list = item_list
+        with self._structure_lock:
+            if self._field_indexes is None:
+                values = {field: [] for field in INDEXED_FIELDS}
+                if self._store is not None:
+                    for call_number, kind, extra in self._store.iter_rows(
+                            "call_number, kind, extra"):
+                        fields = [(field, attribute) for field,
+                                  (field_kind, attribute, _)
+                                  in INDEXED_FIELDS.items()
+                                  if field_kind == kind]
+                        if fields:
+                            extra = json.loads(extra)
+                            attributes = ITEM_KINDS[kind][1]
+                            for field, attribute in fields:
+                                values[field].append(
+                                    (call_number,
+                                     extra[attributes.index(attribute)]))
+                else:
+                    for library_item in self._library_items.values():
+                        for field, value in self._indexed_values(library_item):
+                            values[field].append((library_item.call_number,
+                                                  value))
+                field_indexes = {}
+                for field, (_, _, make_index) in INDEXED_FIELDS.items():
+                    field_indexes[field] = make_index()
+                    field_indexes[field].add_many(values[field])
+                self._field_indexes = field_indexes
+            return self._field_indexes
+
+    def _get_field_index(self, field):
+        """
+        Return the index of a queryable field.
+        :param field: a string, one of INDEXED_FIELDS
+        :return: an EqualityIndex or RangeIndex
+        """
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot query on {field!r}, expected one of "
+                             f"{', '.join(INDEXED_FIELDS)}")
+        return self._get_field_indexes()[field]
+
+    def _retrieve_library_items(self, call_numbers):
+        """
+        Return the library items with the given call numbers, in the same
+        order, skipping any removed since the call numbers were found.
+        :param call_numbers: an iterable of strings
+        :return: a list of library items
+        """
+        library_items = []
+        for call_number in call_numbers:
+            library_item = self.retrieve_library_item_by_call_number(
+                call_number)
+            if library_item is not None:
+                library_items.append(library_item)
+        return library_items
+
+    def find_library_items_by_field(self, field, value):
+        """
+        Find the library items whose field has a value, such as all books
+        by an author. Text fields are matched ignoring case, and a
+        journal matches each of its comma separated names.
+        :param field: a string, one of INDEXED_FIELDS
+        :param value: a string, or a date for release_date
+        :return: a list of library items in call number order
+        """
+        return self._retrieve_library_items(
+            self._get_field_index(field).find(value))
+
+    def find_library_items_in_range(self, field, start=None, end=None):
+        """
+        Find the library items whose field is between two values, such
+        as DVDs released in a date range. Only release_date is ordered.
+        :param field: a string, one of INDEXED_FIELDS
+        :param start: the first value included, such as "01-Jan-2024" or
+        a date, or None for no lower bound
+        :param end: the last value included, or None for no upper bound
+        :return: a list of library items ordered by the field
+        """
+        return self._retrieve_library_items(
+            self._get_field_index(field).find_range(start, end))
+
+    def get_library_item_page(self, page_size=20, cursor=None, kind=None,
+                              available=None):
+        """
+        Return one page of library items in call number order, and the
+        cursor to pass in for the next page.
+        :param page_size: a positive int
+        :param cursor: the cursor returned with the previous page, or
+        None for the first page
+        :param kind: a string such as "book", or a collection of them, to
+        list only items of those kinds, or None for all kinds
+        :param available: True to list only items with copies left, False
+        for only items without, None for both
+        :return: a tuple of a list of library items and the next cursor,
+        which is None after the last page
+        """
+        kinds = {kind} if isinstance(kind, str) else kind
+        call_numbers = self._get_listing_index().page(page_size + 1, cursor,
+                                                      kinds, available)
+        library_items = self._retrieve_library_items(call_numbers[:page_size])
+        next_cursor = None
+        if len(call_numbers) > page_size:
+            next_cursor = call_numbers[page_size - 1]
+        return library_items, next_cursor
+
+    def iter_library_items(self, kind=None, available=None, page_size=1000):
+        """
+        Yield library items in call number order, a page at a time, so
+        only one page of items is built at once.
+        :param kind: a string or collection of strings, or None, see
+        get_library_item_page
+        :param available: True, False or None, see get_library_item_page
+        :param page_size: a positive int
+        :return: a generator of library items
+        """
+        cursor = None
+        while True:
+            library_items, cursor = self.get_library_item_page(
+                page_size, cursor, kind, available)
+            yield from library_items
+            if cursor is None:
+                return
 
     def get_library_item_list(self):
         """
         Return list of library items.
         :return: list of library item type objects
         """
-        return self._library_item_list
+        if self._store is None:
+            return list(self._library_items.values())
+        library_items = []
+        for row in self._store.iter_rows():
+            library_item = self._library_items.get(row[0])
+            if library_item is None:
+                library_item = self._store.from_row(row)
+                self._library_items[row[0]] = library_item
+            library_items.append(library_item)
+        return library_items
 
     def find_library_item(self, title):
         """
@@ -27,28 +396,96 @@ class Catalogue:
         :param title: a string
         :return: a list of titles.
         """
-        title_list = []
-        for library_item in self._library_item_list:
-            title_list.append(library_item.get_title())
-        results = difflib.get_close_matches(title, title_list,
-                                            cutoff=0.5)
-        return results
+        return self._get_title_index().search(title, cutoff=0.5)
 
     def add_item(self):
         """
         Add a brand new book to the library with a unique call number.
         """
         new_library_item = LibraryItemGenerator.generate_library_item()
-        found_library_item = self.retrieve_library_item_by_call_number(
-            new_library_item.call_number)
-
-        if found_library_item:
-            print(f"Could not add item with call number "
-                  f"{new_library_item.call_number}. It already exists. ")
-        else:
-            self._library_item_list.append(new_library_item)
+        if self.add_library_item(new_library_item):
             print("item added successfully! item details:")
             print(new_library_item)
+        else:
+            print(f"Could not add item with call number "
+                  f"{new_library_item.call_number}. It already exists. ")
+
+    def add_library_item(self, library_item):
+        """
+        Add a library item to the catalogue if its call number is new.
+        :param library_item: a library item object
+        :return: True if the item was added, False if an item with its
+        call number already exists.
+        """
+        with self._structure_lock:
+            if self._contains(library_item.call_number):
+                return False
+            self._insert_library_item(library_item)
+            return True
+
+    def add_library_items(self, library_items):
+        """
+        Add many library items at once. Call numbers are checked against
+        the catalogue and each other in one pass, and with a store all
+        new items are written in one transaction.
+        :param library_items: an iterable of library item objects
+        :return: a list of the items that were not added because their
+        call number already exists.
+        """
+        library_items = list(library_items)
+        with self._structure_lock:
+            existing = set()
+            if self._store is not None:
+                existing = self._store.existing_call_numbers(
+                    library_item.call_number for library_item in library_items)
+            new_library_items = {}
+            rejected = []
+            for library_item in library_items:
+                call_number = library_item.call_number
+                if call_number in new_library_items or \
+                        call_number in existing or \
+                        call_number in self._library_items:
+                    rejected.append(library_item)
+                else:
+                    new_library_items[call_number] = library_item
+            if self._store is not None:
+                # stored items are only built again when asked for
+                self._store.save_many(new_library_items.values())
+            else:
+                self._library_items.update(new_library_items)
+            if self._title_index is not None:
+                for call_number, library_item in new_library_items.items():
+                    self._title_index.add(call_number,
+                                          library_item.get_title(),
+                                          library_item.get_search_key())
+            if self._listing_index is not None:
+                self._listing_index.add_many(
+                    (call_number, self.item_kind(library_item),
+                     library_item.check_availability())
+                    for call_number, library_item in new_library_items.items())
+            if self._field_indexes is not None:
+                values = {field: [] for field in INDEXED_FIELDS}
+                for call_number, library_item in new_library_items.items():
+                    for field, value in self._indexed_values(library_item):
+                        values[field].append((call_number, value))
+                for field, entries in values.items():
+                    self._field_indexes[field].add_many(entries)
+        return rejected
+
+    def discard_library_item(self, call_number):
+        """
+        Remove the library item with the given call number if there is
+        one. Finding and removing the item happen under one lock, so an
+        item removed from two threads at once is only removed once.
+        :param call_number: a string
+        :return: the removed library item, or None if it was not found
+        """
+        with self._structure_lock:
+            library_item = self.retrieve_library_item_by_call_number(
+                call_number)
+            if library_item is not None:
+                self._delete_library_item(library_item)
+        return library_item
 
     def remove_library_item(self, call_number):
         """
@@ -56,9 +493,8 @@ class Catalogue:
         :param call_number: a string
         :precondition call_number: a unique identifier
         """
-        found_library_item = self.retrieve_library_item_by_call_number(call_number)
+        found_library_item = self.discard_library_item(call_number)
         if found_library_item:
-            self._library_item_list.remove(found_library_item)
             print(f"Successfully removed {found_library_item.get_title()} with "
                   f"call number: {call_number}")
         else:
@@ -75,7 +511,11 @@ class Catalogue:
         """
         library_item = self.retrieve_library_item_by_call_number(call_number)
         if library_item:
-            library_item.decrement_number_of_copies()
+            with self._copy_lock(call_number):
+                was_available = library_item.check_availability()
+                library_item.decrement_number_of_copies()
+                self._save_num_copies(library_item)
+                self._update_availability(library_item, was_available)
             return True
         else:
             return False
@@ -91,20 +531,102 @@ class Catalogue:
         """
         library_item = self.retrieve_library_item_by_call_number(call_number)
         if library_item:
-            library_item.increment_number_of_copies()
+            with self._copy_lock(call_number):
+                was_available = library_item.check_availability()
+                library_item.increment_number_of_copies()
+                self._save_num_copies(library_item)
+                self._update_availability(library_item, was_available)
             return True
         else:
             return False
 
+    def check_out_library_item(self, call_number):
+        """
+        Take one copy of the library item with the given call number if
+        there is one left. Checking availability and taking the copy
+        happen under one lock, so concurrent checkouts never take more
+        copies than there are.
+        :param call_number: a string
+        :precondition call_number: a unique identifier
+        :return: a CheckoutStatus
+        """
+        library_item = self.retrieve_library_item_by_call_number(call_number)
+        if library_item is None:
+            return CheckoutStatus.NOT_FOUND
+        with self._copy_lock(call_number):
+            if not library_item.check_availability():
+                return CheckoutStatus.UNAVAILABLE
+            library_item.decrement_number_of_copies()
+            self._save_num_copies(library_item)
+            self._update_availability(library_item, True)
+        return CheckoutStatus.COMPLETE
+
+    def check_out_library_items(self, call_numbers):
+        """
+        Check out one copy per call number given, all or nothing. A call
+        number can be given more than once to take several copies.
+        :param call_numbers: an iterable of strings
+        :return: a tuple of a CheckoutStatus and the first call number
+        that could not be checked out, or None if all were.
+        """
+        wanted = Counter(call_numbers)
+        library_items = {}
+        for call_number in wanted:
+            library_item = self.retrieve_library_item_by_call_number(
+                call_number)
+            if library_item is None:
+                return CheckoutStatus.NOT_FOUND, call_number
+            library_items[call_number] = library_item
+        with self._holding_copy_locks(wanted):
+            for call_number, count in wanted.items():
+                if library_items[call_number].get_num_copies() < count:
+                    return CheckoutStatus.UNAVAILABLE, call_number
+            for call_number, count in wanted.items():
+                for _ in range(count):
+                    library_items[call_number].decrement_number_of_copies()
+                self._update_availability(library_items[call_number], True)
+            self._save_num_copies_many(library_items.values())
+        return CheckoutStatus.COMPLETE, None
+
+    def return_library_items(self, call_numbers):
+        """
+        Return one copy per call number given, all or nothing.
+        :param call_numbers: an iterable of strings
+        :return: a tuple of True and None if all were returned, or False
+        and the first call number that is not in the catalogue.
+        """
+        returned = Counter(call_numbers)
+        library_items = {}
+        for call_number in returned:
+            library_item = self.retrieve_library_item_by_call_number(
+                call_number)
+            if library_item is None:
+                return False, call_number
+            library_items[call_number] = library_item
+        with self._holding_copy_locks(returned):
+            for call_number, count in returned.items():
+                was_available = library_items[call_number].check_availability()
+                for _ in range(count):
+                    library_items[call_number].increment_number_of_copies()
+                self._update_availability(library_items[call_number],
+                                          was_available)
+            self._save_num_copies_many(library_items.values())
+        return True, None
+
     def retrieve_library_item_by_call_number(self, call_number):
         """
         Retrieve of a library item with the given call number from the catalogue.
         :param call_number: a string
         :return: library item object if found, None otherwise
         """
-        found_library_item = None
-        for library_item in self._library_item_list:
-            if library_item.call_number == call_number:
-                found_library_item = library_item
-                break
-        return found_library_item
+        library_item = self._library_items.get(call_number)
+        if library_item is None and self._store is not None:
+            # loading and caching happen under the structure lock, so an
+            # item removed in between is never cached again
+            with self._structure_lock:
+                library_item = self._library_items.get(call_number)
+                if library_item is None:
+                    library_item = self._store.load(call_number)
+                    if library_item is not None:
+                        self._library_items[call_number] = library_item
+        return library_item
@@ -0,0 +1,199 @@
+"""
+module containing the SQLite storage backend for the catalogue.
+"""
+import json
+import sqlite3
+import threading
+
+from book import Book
+from dvd import DVD
+from journal import Journal
+
+# library item classes by the kind stored in the database, with the
+# names of their extra attributes in constructor order
+ITEM_KINDS = {
+    "book": (Book, ("_author",)),
+    "journal": (Journal, ("_names", "_issue_number", "_publisher")),
+    "dvd": (DVD, ("_release_date", "_region_code")),
+}
+
+
+class CatalogueStore:
+    """
+    Stores library items in an SQLite database, one row per item. Items
+    are only read when asked for, so opening a store is instant however
+    many items it holds, and every change is written as it happens.
+    """
+
+    def __init__(self, path):
+        """
+        Open or create a store.
+        :param path: a string, the database file
+        """
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS library_items ("
+                "call_number TEXT PRIMARY KEY, kind TEXT NOT NULL, "
+                "title TEXT NOT NULL, num_copies INTEGER NOT NULL, "
+                "extra TEXT NOT NULL)")
+
+    @staticmethod
+    def to_row(library_item):
+        """
+        Returns the database row of a library item.
+        :param library_item: a Book, Journal or DVD
+        :return: a tuple
+        """
+        for kind, (item_class, attributes) in ITEM_KINDS.items():
+            if type(library_item) is item_class:
+                extra = [getattr(library_item, name) for name in attributes]
+                return (library_item.call_number, kind, library_item.title,
+                        library_item.get_num_copies(), json.dumps(extra))
+        raise TypeError(f"Cannot store {type(library_item).__name__} items")
+
+    @staticmethod
+    def from_row(row):
+        """
+        Returns the library item stored in a database row.
+        :param row: a tuple from the library_items table
+        :return: a Book, Journal or DVD
+        """
+        call_number, kind, title, num_copies, extra = row
+        item_class, _ = ITEM_KINDS[kind]
+        return item_class(call_number, title, num_copies, *json.loads(extra))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM library_items").fetchone()[0]
+
+    def __contains__(self, call_number):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM library_items WHERE call_number = ?",
+                (call_number,)).fetchone() is not None
+
+    def load(self, call_number):
+        """
+        Returns the library item with the given call number.
+        :param call_number: a string
+        :return: a library item, or None if it is not stored
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT call_number, kind, title, num_copies, extra "
+                "FROM library_items WHERE call_number = ?",
+                (call_number,)).fetchone()
+        return self.from_row(row) if row else None
+
+    def save(self, library_item):
+        """
+        Stores a library item, replacing any item with its call number.
+        :param library_item: a Book, Journal or DVD
+        """
+        self.save_many([library_item])
+
+    def save_many(self, library_items):
+        """
+        Stores library items in a single transaction.
+        :param library_items: an iterable of Books, Journals and DVDs
+        """
+        rows = [self.to_row(library_item) for library_item in library_items]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO library_items "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def update_num_copies(self, call_number, num_copies):
+        """
+        Writes a new number of copies for a stored library item.
+        :param call_number: a string
+        :param num_copies: an int
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE library_items SET num_copies = ? "
+                "WHERE call_number = ?", (num_copies, call_number))
+
+    def update_num_copies_many(self, copies):
+        """
+        Writes new numbers of copies for stored library items in a
+        single transaction.
+        :param copies: an iterable of (call number, int) tuples
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE library_items SET num_copies = ? "
+                "WHERE call_number = ?",
+                [(num_copies, call_number)
+                 for call_number, num_copies in copies])
+
+    def existing_call_numbers(self, call_numbers, batch_size=500):
+        """
+        Returns which of the given call numbers are stored, looking them
+        up in batches rather than one at a time.
+        :param call_numbers: an iterable of strings
+        :param batch_size: a positive int
+        :return: a set of strings
+        """
+        call_numbers = list(call_numbers)
+        existing = set()
+        for start in range(0, len(call_numbers), batch_size):
+            batch = call_numbers[start:start + batch_size]
+            placeholders = ", ".join("?" * len(batch))
+            with self._lock:
+                existing.update(row[0] for row in self._connection.execute(
+                    f"SELECT call_number FROM library_items "
+                    f"WHERE call_number IN ({placeholders})", batch))
+        return existing
+
+    def delete(self, call_number):
+        """
+        Removes the library item with the given call number.
+        :param call_number: a string
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM library_items WHERE call_number = ?",
+                (call_number,))
+
+    def iter_rows(self, columns="call_number, kind, title, num_copies, "
+                                "extra", batch_size=10000):
+        """
+        Yields the rows of all stored items in the order they were
+        added, fetched in batches so the whole table is never in memory.
+        :param columns: a string, the columns to select
+        :param batch_size: a positive int
+        :return: a generator of tuples
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT rowid, {columns} FROM library_items "
+                    f"WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for row in rows:
+                yield row[1:]
+
+    def iter_titles(self):
+        """
+        Yields the call number and title of every stored item without
+        building the items.
+        :return: a generator of (call number, title) tuples
+        """
+        return self.iter_rows("call_number, title")
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        with self._lock:
+            self._connection.close()
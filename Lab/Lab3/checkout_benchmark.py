@@ -0,0 +1,102 @@
+"""
+module containing a stress benchmark for concurrent checkouts and
+returns on the catalogue.
+"""
+import argparse
+import random
+import threading
+import time
+
+from book import Book
+from catalogue import Catalogue, CheckoutStatus
+from cataloguestore import CatalogueStore
+
+
+def run_workers(catalogue, call_numbers, thread_count, operations):
+    """
+    Run operations random checkouts and returns spread over
+    thread_count threads, and return the elapsed time and the number of
+    successful checkouts and returns per call number.
+    :param catalogue: a Catalogue
+    :param call_numbers: a list of strings
+    :param thread_count: a positive int
+    :param operations: a positive int
+    :return: a tuple of the elapsed seconds and a dict of call numbers
+    to the net number of copies taken
+    """
+    taken = {call_number: 0 for call_number in call_numbers}
+    taken_lock = threading.Lock()
+    start_barrier = threading.Barrier(thread_count + 1)
+
+    def worker(seed, count):
+        generator = random.Random(seed)
+        local_taken = {}
+        start_barrier.wait()
+        for _ in range(count):
+            call_number = generator.choice(call_numbers)
+            if local_taken.get(call_number, 0) > 0 and generator.random() < 0.3:
+                catalogue.increment_library_item_count(call_number)
+                local_taken[call_number] -= 1
+            elif catalogue.check_out_library_item(call_number) \
+                    is CheckoutStatus.COMPLETE:
+                local_taken[call_number] = local_taken.get(call_number, 0) + 1
+        with taken_lock:
+            for call_number, count in local_taken.items():
+                taken[call_number] += count
+
+    threads = [threading.Thread(target=worker,
+                                args=(seed, operations // thread_count))
+               for seed in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start_time, taken
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--items", type=int, default=1000,
+                        help="The number of items in the catalogue.")
+    parser.add_argument("-c", "--copies", type=int, default=5,
+                        help="The number of copies of every item.")
+    parser.add_argument("-o", "--operations", type=int, default=200000,
+                        help="The number of checkouts and returns per run.")
+    parser.add_argument("-t", "--threads", type=int, nargs="+",
+                        default=[1, 2, 4, 8, 16],
+                        help="The thread counts to run with.")
+    parser.add_argument("-d", "--database",
+                        help="An SQLite file to back the catalogue with, "
+                             "so every change is written to disk.")
+    args = parser.parse_args()
+
+    call_numbers = [f"{number:06d}" for number in range(args.items)]
+    print(f"{'threads':>8} {'operations/s':>14} {'errors':>7}")
+    for thread_count in args.threads:
+        store = None
+        if args.database:
+            store = CatalogueStore(args.database)
+            store.save_many(Book(call_number, "Benchmark", args.copies, "")
+                            for call_number in call_numbers)
+        catalogue = Catalogue([Book(call_number, "Benchmark", args.copies, "")
+                               for call_number in call_numbers], store)
+        elapsed, taken = run_workers(catalogue, call_numbers, thread_count,
+                                     args.operations)
+        errors = 0
+        for call_number in call_numbers:
+            library_item = catalogue.retrieve_library_item_by_call_number(
+                call_number)
+            if taken[call_number] > args.copies or \
+                    library_item.get_num_copies() != \
+                    args.copies - taken[call_number]:
+                errors += 1
+        print(f"{thread_count:>8} {args.operations / elapsed:>14,.0f} "
+              f"{errors:>7}")
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
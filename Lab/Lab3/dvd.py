@@ -1,4 +1,4 @@
-from libraryitem import LibraryItem
+from libraryitem import LibraryItem, intern_field
 
 
 class DVD(LibraryItem):
@@ -6,6 +6,7 @@ class DVD(LibraryItem):
     Represents a single journal in a library which is identified through
     it's call number.
     """
+    __slots__ = ("_release_date", "_region_code")
 
     def __init__(self, call_num, title, num_copies, release_date, region_code):
         """
@@ -17,8 +18,8 @@ class DVD(LibraryItem):
         :precondition call_num: a unique identifier
         :precondition num_copies: a positive integer
         """
-        self._release_date = release_date
-        self._region_code = region_code
+        self._release_date = intern_field(release_date)
+        self._region_code = intern_field(region_code)
         super().__init__(call_num, title, num_copies)
 
     def __str__(self):
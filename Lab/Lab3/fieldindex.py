@@ -0,0 +1,193 @@
+"""
+module containing the secondary indexes used to query catalogue items
+by author, publisher, names and release date.
+"""
+import bisect
+import datetime
+import operator
+import threading
+
+
+def field_key(value):
+    """
+    Return the key a field value is indexed under, ignoring case and
+    extra spaces.
+    :param value: a string
+    :return: a string
+    """
+    return " ".join(str(value).split()).casefold()
+
+
+def parse_release_date(value):
+    """
+    Return the date of a release date such as "28-Dec-2023".
+    :param value: a string, a date, or a datetime whose date is used
+    :return: a date, or None if the value is not a valid date
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.datetime.strptime(str(value).strip(),
+                                          "%d-%b-%Y").date()
+    except ValueError:
+        return None
+
+
+class EqualityIndex:
+    """
+    Maps the values of a text field to the call numbers of the items
+    that have them, for exact lookups that ignore case.
+    """
+
+    def __init__(self, separator=None):
+        """
+        :param separator: a string such as "," to index each part of a
+        value on its own, or None to index whole values
+        """
+        self._separator = separator
+        self._call_numbers = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, value):
+        parts = [value] if self._separator is None \
+            else str(value).split(self._separator)
+        return {field_key(part) for part in parts} - {""}
+
+    def add(self, call_number, value):
+        """
+        Adds the value of an item's field to the index.
+        :param call_number: a string
+        :param value: a string
+        """
+        self.add_many([(call_number, value)])
+
+    def add_many(self, entries):
+        """
+        Adds the values of many items' fields to the index.
+        :param entries: an iterable of (call number, value) tuples
+        """
+        with self._lock:
+            for call_number, value in entries:
+                for key in self._keys(value):
+                    self._call_numbers.setdefault(key, set()).add(call_number)
+
+    def remove(self, call_number, value):
+        """
+        Removes the value of an item's field from the index.
+        :param call_number: a string
+        :param value: a string
+        """
+        with self._lock:
+            for key in self._keys(value):
+                call_numbers = self._call_numbers.get(key)
+                if call_numbers is not None:
+                    call_numbers.discard(call_number)
+                    if not call_numbers:
+                        del self._call_numbers[key]
+
+    def find(self, value):
+        """
+        Returns the call numbers of the items with a value.
+        :param value: a string
+        :return: a sorted list of strings
+        """
+        with self._lock:
+            return sorted(self._call_numbers.get(field_key(value), ()))
+
+    def find_range(self, start=None, end=None):
+        """
+        Text fields are not ordered, so they cannot be queried by range.
+        """
+        raise ValueError("Range queries are only supported on ordered "
+                         "fields such as release_date")
+
+
+class RangeIndex:
+    """
+    Keeps the call numbers of items in a sorted list ordered by a field,
+    so the items with values between two bounds are found by binary
+    search. Values the key function cannot read are not indexed.
+    """
+
+    def __init__(self, key):
+        """
+        :param key: a function turning a field value into a comparable
+        key, or None if the value cannot be ordered
+        """
+        self._key = key
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def add(self, call_number, value):
+        """
+        Adds the value of an item's field to the index.
+        :param call_number: a string
+        :param value: the field value
+        """
+        key = self._key(value)
+        if key is not None:
+            with self._lock:
+                bisect.insort(self._entries, (key, call_number))
+
+    def add_many(self, entries):
+        """
+        Adds the values of many items' fields, sorting the index once
+        instead of inserting one at a time.
+        :param entries: an iterable of (call number, value) tuples
+        """
+        keyed = [(self._key(value), call_number)
+                 for call_number, value in entries]
+        with self._lock:
+            self._entries.extend(entry for entry in keyed
+                                 if entry[0] is not None)
+            self._entries.sort()
+
+    def remove(self, call_number, value):
+        """
+        Removes the value of an item's field from the index.
+        :param call_number: a string
+        :param value: the field value
+        """
+        key = self._key(value)
+        if key is None:
+            return
+        with self._lock:
+            position = bisect.bisect_left(self._entries, (key, call_number))
+            if position < len(self._entries) and \
+                    self._entries[position] == (key, call_number):
+                del self._entries[position]
+
+    def find(self, value):
+        """
+        Returns the call numbers of the items with a value.
+        :param value: the field value
+        :return: a sorted list of strings
+        """
+        return self.find_range(value, value)
+
+    def find_range(self, start=None, end=None):
+        """
+        Returns the call numbers of the items with values from start to
+        end, both included, ordered by value and then call number.
+        :param start: the lowest value, or None for no lower bound
+        :param end: the highest value, or None for no upper bound
+        :return: a list of strings
+        """
+        bounds = []
+        for bound in (start, end):
+            key = None if bound is None else self._key(bound)
+            if bound is not None and key is None:
+                raise ValueError(f"{bound!r} is not a valid bound")
+            bounds.append(key)
+        start_key, end_key = bounds
+        with self._lock:
+            first = 0 if start_key is None \
+                else bisect.bisect_left(self._entries, start_key,
+                                        key=operator.itemgetter(0))
+            last = len(self._entries) if end_key is None \
+                else bisect.bisect_right(self._entries, end_key,
+                                         key=operator.itemgetter(0))
+            return [call_number
+                    for _, call_number in self._entries[first:last]]
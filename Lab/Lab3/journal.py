@@ -1,4 +1,4 @@
-from libraryitem import LibraryItem
+from libraryitem import LibraryItem, intern_field
 
 
 class Journal(LibraryItem):
@@ -6,6 +6,7 @@ class Journal(LibraryItem):
     Represents a single journal in a library which is identified through
     it's call number.
     """
+    __slots__ = ("_issue_number", "_publisher", "_names")
 
     def __init__(self, call_num, title, num_copies, names, issue_number, publisher):
         """
@@ -18,9 +19,9 @@ class Journal(LibraryItem):
         :precondition call_num: a unique identifier
         :precondition num_copies: a positive integer
         """
-        self._issue_number = issue_number
-        self._publisher = publisher
-        self._names = names
+        self._issue_number = intern_field(issue_number)
+        self._publisher = intern_field(publisher)
+        self._names = intern_field(names)
         super().__init__(call_num, title, num_copies)
 
     def __str__(self):
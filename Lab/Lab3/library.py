@@ -1,6 +1,10 @@
 """ This module houses the library"""
+import argparse
+import sys
+
 from book import Book
-from catalogue import Catalogue
+from catalogue import Catalogue, CheckoutStatus
+from cataloguestore import CatalogueStore
 from journal import Journal
 from dvd import DVD
 
@@ -11,12 +15,14 @@ class Library:
     interface for users to check out, return and find library items.
     """
 
-    def __init__(self, library_item_list):
+    def __init__(self, library_item_list, store=None):
         """
         Initialize the library with a catalogue of library items.
         :param library_item_list: a sequence of library item objects.
+        :param store: a CatalogueStore to keep the catalogue in, or None
+        to keep it in memory.
         """
-        self._catalogue = Catalogue(library_item_list)
+        self._catalogue = Catalogue(library_item_list, store)
 
     def check_out(self, call_number):
         """
@@ -24,14 +30,12 @@ class Library:
         :param call_number: a string
         :precondition call_number: a unique identifier
         """
-        library_item = self._catalogue.retrieve_library_item_by_call_number(call_number)
-        if library_item.check_availability():
-            status = self._catalogue.reduce_library_item_count(call_number)
-            if status:
-                print("Checkout complete!")
-            else:
-                print(f"Could not find item with call number {call_number}"
-                      f". Checkout failed.")
+        status = self._catalogue.check_out_library_item(call_number)
+        if status is CheckoutStatus.COMPLETE:
+            print("Checkout complete!")
+        elif status is CheckoutStatus.NOT_FOUND:
+            print(f"Could not find item with call number {call_number}"
+                  f". Checkout failed.")
         else:
             print(f"No copies left for call number {call_number}"
                   f". Checkout failed.")
@@ -42,7 +46,7 @@ class Library:
         :param call_number: a string
         :precondition call_number: a unique identifier
         """
-        status = self._catalogue.retrieve_library_item_by_call_number(call_number)
+        status = self._catalogue.increment_library_item_count(call_number)
         if status:
             print("item returned successfully!")
         else:
@@ -108,20 +112,41 @@ class Library:
 
         print("Thank you for visiting the Library.")
 
-    def display_available_items(self):
+    def display_available_items(self, page_size=20, kind=None,
+                                available=None):
         """
-        Display all the items in the library.
+        Display the items in the library a page at a time, in call
+        number order. Only the items on the page shown are looked up, and
+        each page is written to the screen in one go.
+        :param page_size: a positive int, the items shown per page
+        :param kind: a string such as "book" to only show that kind of
+        item, or None for all kinds
+        :param available: True to only show items with copies left,
+        False for only items without, None for both
         """
         print("List of items in the library")
         print("--------------", end="\n\n")
-        for library_item in self._catalogue.get_library_item_list():
-            print(library_item)
+        cursor = None
+        while True:
+            library_items, cursor = self._catalogue.get_library_item_page(
+                page_size, cursor, kind, available)
+            sys.stdout.write("".join(f"{library_item}\n"
+                                     for library_item in library_items))
+            if cursor is None or input("Press Enter for more items, "
+                                       "or q to stop").lower() == "q":
+                break
 
 
 def main():
     """
     Creates a library with dummy data and prompts the user for input.
+    With a database, the dummy data is only added to an empty database.
     """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--database",
+                        help="An SQLite file to keep the catalogue in. "
+                             "Changes are saved as they are made.")
+    args = parser.parse_args()
 
     item_list = [
         Book("100.200.300", "Harry Potter 1", 2, "J K Rowling"),
@@ -134,8 +159,18 @@ def main():
         DVD("200.100.200", "Mission Impossible 10", 2, "02-Apr-2025", 81759)
     ]
 
-    my_epic_library = Library(item_list)
-    my_epic_library.display_library_menu()
+    if args.database:
+        store = CatalogueStore(args.database)
+        if len(store) > 0:
+            item_list = []
+        my_epic_library = Library(item_list, store)
+        try:
+            my_epic_library.display_library_menu()
+        finally:
+            store.close()
+    else:
+        my_epic_library = Library(item_list)
+        my_epic_library.display_library_menu()
 
 
 if __name__ == '__main__':
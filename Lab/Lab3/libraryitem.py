@@ -1,6 +1,37 @@
 """
 module containing the interface for library items
 """
+import sys
+
+
+def intern_field(value):
+    """
+    Returns the interned copy of a string so items repeating the same
+    author, publisher or similar share one string object. Values that
+    are not strings are returned as they are.
+    :param value: any value
+    :return: the value, interned if it is a string
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def normalize_title(title):
+    """
+    Returns the display form and the case-insensitive search key of a
+    title. Either is the title itself when normalizing does not change
+    it, so no extra string is kept.
+    :param title: a string
+    :return: a tuple of two strings
+    """
+    display_title = title.title()
+    if display_title == title:
+        display_title = title
+    search_key = title.casefold()
+    if search_key == title:
+        search_key = title
+    return display_title, search_key
 
 
 class LibraryItem:
@@ -8,6 +39,8 @@ class LibraryItem:
         Represents an item in a library which is identified through
         it's call number.
         """
+    __slots__ = ("_call_num", "_title", "_num_copies", "_display_title",
+                 "_search_key")
 
     def __init__(self, call_num, title, num_copies):
         """
@@ -18,15 +51,33 @@ class LibraryItem:
         :precondition num_copies: a positive integer
         """
         self._call_num = call_num
-        self._title = title
         self._num_copies = num_copies
+        self._title = title
+        self._display_title, self._search_key = normalize_title(title)
+
+    @property
+    def title(self):
+        """
+        The title as it was given. Like the call number it cannot be
+        set, since the catalogue indexes items by their title.
+        :return: a string
+        """
+        return self._title
 
     def get_title(self):
         """
         Returns the title of the library item.
         :return: a string
         """
-        return self._title.title()
+        return self._display_title
+
+    def get_search_key(self):
+        """
+        Returns the casefolded title, used to compare titles without
+        regard to case.
+        :return: a string
+        """
+        return self._search_key
 
     def increment_number_of_copies(self):
         """
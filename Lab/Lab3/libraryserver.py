@@ -0,0 +1,183 @@
+"""
+module containing an asyncio server giving many clients at once access
+to one catalogue over a JSON Lines protocol.
+
+Every request is one line holding a JSON object with an "op" field, and
+gets one line back holding a JSON object with an "ok" field:
+
+    {"op": "check_out", "call_number": "100.200.300"}
+    {"op": "return", "call_number": "100.200.300"}
+    {"op": "find", "title": "Harry Potter"}
+    {"op": "add", "item": {"type": "book", "call_number": "1", ...}}
+    {"op": "remove", "call_number": "100.200.300"}
+
+Requests on one connection are answered in order, so a client may send
+several before reading the responses.
+"""
+import argparse
+import asyncio
+import json
+
+from bulkimport import InvalidRecordError, build_library_item_from_record
+from catalogue import Catalogue, CheckoutStatus
+from cataloguestore import CatalogueStore
+
+# the longest request line accepted, in bytes
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+class InvalidRequestError(Exception):
+    def __init__(self, my_msg):
+        super().__init__(my_msg)
+
+
+class LibraryServer:
+    """
+    Serves requests for one catalogue. Catalogue calls run in worker
+    threads, since the catalogue is thread-safe and a call may wait on
+    its database, so a slow request never holds up other clients.
+    """
+
+    def __init__(self, catalogue):
+        """
+        :param catalogue: a Catalogue
+        """
+        self._catalogue = catalogue
+        self._operations = {
+            "check_out": self._check_out,
+            "return": self._return_item,
+            "find": self._find,
+            "add": self._add,
+            "remove": self._remove,
+        }
+
+    @staticmethod
+    def _field(request, name):
+        value = request.get(name)
+        if not isinstance(value, str) or not value:
+            raise InvalidRequestError(f"{name} must be a non-empty string")
+        return value
+
+    def _check_out(self, request):
+        status = self._catalogue.check_out_library_item(
+            self._field(request, "call_number"))
+        return {"ok": status is CheckoutStatus.COMPLETE,
+                "status": status.value}
+
+    def _return_item(self, request):
+        found = self._catalogue.increment_library_item_count(
+            self._field(request, "call_number"))
+        return {"ok": found, "status": "complete" if found else "not found"}
+
+    def _find(self, request):
+        return {"ok": True, "titles": self._catalogue.find_library_item(
+            self._field(request, "title"))}
+
+    def _add(self, request):
+        try:
+            library_item = build_library_item_from_record(request.get("item"))
+        except InvalidRecordError as error:
+            raise InvalidRequestError(str(error))
+        added = self._catalogue.add_library_item(library_item)
+        return {"ok": added, "status": "complete" if added else "exists"}
+
+    def _remove(self, request):
+        removed = self._catalogue.discard_library_item(
+            self._field(request, "call_number"))
+        return {"ok": removed is not None,
+                "status": "complete" if removed else "not found"}
+
+    def handle_request(self, line):
+        """
+        Answers one request line. Runs in a worker thread.
+        :param line: bytes, a JSON object
+        :return: a dict, the response
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise InvalidRequestError("Request is not an object")
+            operation = self._operations.get(request.get("op"))
+            if operation is None:
+                raise InvalidRequestError(
+                    f"Unknown op {request.get('op')!r}, expected one of "
+                    f"{', '.join(self._operations)}")
+            return operation(request)
+        except (InvalidRequestError, ValueError) as error:
+            return {"ok": False, "error": str(error)}
+        except Exception as error:
+            # a request the checks above let through must not take the
+            # connection down with it
+            return {"ok": False,
+                    "error": f"{type(error).__name__}: {error}"}
+
+    async def handle_client(self, reader, writer):
+        """
+        Answers the requests of one connection until it is closed.
+        :param reader: an asyncio StreamReader
+        :param writer: an asyncio StreamWriter
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line was longer than the reader's limit
+                    writer.write(b'{"ok": false, "error": "Request too '
+                                 b'long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await asyncio.to_thread(self.handle_request, line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host, port):
+        """
+        Serves clients until cancelled.
+        :param host: a string
+        :param port: an int
+        """
+        server = await asyncio.start_server(self.handle_client, host, port,
+                                            limit=MAX_REQUEST_SIZE)
+        async with server:
+            print(f"Serving the library on {host}:{port}")
+            await server.serve_forever()
+
+
+def main():
+    """
+    Serves a catalogue, kept in memory or in an SQLite file.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="The address to listen on.")
+    parser.add_argument("-p", "--port", type=int, default=8765,
+                        help="The port to listen on.")
+    parser.add_argument("-d", "--database",
+                        help="An SQLite file to keep the catalogue in.")
+    args = parser.parse_args()
+
+    store = CatalogueStore(args.database) if args.database else None
+    try:
+        asyncio.run(LibraryServer(Catalogue([], store)).serve(args.host,
+                                                              args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+module containing the index used to list catalogue items page by page.
+"""
+import bisect
+import heapq
+import itertools
+import threading
+
+
+class ListingIndex:
+    """
+    Keeps the call numbers of the catalogue in sorted lists, one per
+    kind of item and availability. A page is found by binary search
+    from the last call number of the previous page, so listing never
+    scans the items before the page or the items filtered out.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def add(self, call_number, kind, available):
+        """
+        Adds a call number to the index.
+        :param call_number: a string
+        :param kind: a string, such as "book"
+        :param available: a Boolean, True if copies are left
+        """
+        with self._lock:
+            bisect.insort(self._buckets.setdefault((kind, available), []),
+                          call_number)
+
+    def add_many(self, entries):
+        """
+        Adds many call numbers at once, sorting each list once instead
+        of inserting one at a time.
+        :param entries: an iterable of (call number, kind, available)
+        tuples
+        """
+        grouped = {}
+        for call_number, kind, available in entries:
+            grouped.setdefault((kind, available), []).append(call_number)
+        with self._lock:
+            for key, call_numbers in grouped.items():
+                bucket = self._buckets.setdefault(key, [])
+                bucket.extend(call_numbers)
+                bucket.sort()
+
+    def remove(self, call_number, kind, available):
+        """
+        Removes a call number from the index if it is there.
+        :param call_number: a string
+        :param kind: a string
+        :param available: a Boolean
+        """
+        with self._lock:
+            bucket = self._buckets.get((kind, available), [])
+            position = bisect.bisect_left(bucket, call_number)
+            if position < len(bucket) and bucket[position] == call_number:
+                del bucket[position]
+
+    def set_available(self, call_number, kind, available):
+        """
+        Moves a call number to the list for its new availability.
+        :param call_number: a string
+        :param kind: a string
+        :param available: a Boolean, the new availability
+        """
+        self.remove(call_number, kind, not available)
+        self.add(call_number, kind, available)
+
+    def page(self, limit, after=None, kinds=None, available=None):
+        """
+        Returns up to limit call numbers in order, starting after a
+        given call number.
+        :param limit: a positive int
+        :param after: a string, the last call number of the previous
+        page, or None to start at the beginning
+        :param kinds: a collection of kinds to list, or None for all
+        :param available: True or False to list only available or
+        unavailable items, None for both
+        :return: a list of strings
+        """
+        with self._lock:
+            slices = []
+            for (kind, bucket_available), bucket in self._buckets.items():
+                if kinds is not None and kind not in kinds:
+                    continue
+                if available is not None and bucket_available != available:
+                    continue
+                start = 0 if after is None \
+                    else bisect.bisect_right(bucket, after)
+                slices.append(bucket[start:start + limit])
+        return list(itertools.islice(heapq.merge(*slices), limit))
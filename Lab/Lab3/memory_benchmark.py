@@ -0,0 +1,69 @@
+"""
+module containing a benchmark of the memory used per library item.
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from book import Book
+from dvd import DVD
+from journal import Journal
+
+
+def generate_library_items(count, seed=0):
+    """
+    Return count books, journals and DVDs whose authors, publishers,
+    names, release dates and region codes come from small pools, the
+    way they repeat in a real catalogue. Every field is built as a new
+    string, as it would be when read from a file.
+    :param count: a positive int
+    :param seed: an int
+    :return: a list of library items
+    """
+    generator = random.Random(seed)
+    authors = [f"Author {number}" for number in range(2000)]
+    publishers = [f"Publisher {number}" for number in range(200)]
+    release_dates = [f"{day:02d}-Jan-{year}" for day in range(1, 29)
+                     for year in range(1990, 2025)]
+    library_items = []
+    for number in range(count):
+        call_number = f"{number // 1000:03d}.{number % 1000:03d}.{number:07d}"
+        title = f"Title {number}"
+        kind = number % 3
+        if kind == 0:
+            library_items.append(Book(call_number, title, 2,
+                                      "".join(generator.choice(authors))))
+        elif kind == 1:
+            library_items.append(Journal(call_number, title, 1,
+                                         "".join(generator.choice(authors)),
+                                         str(generator.randrange(1, 50)),
+                                         "".join(generator.choice(publishers))))
+        else:
+            library_items.append(DVD(call_number, title, 1,
+                                     "".join(generator.choice(release_dates)),
+                                     str(generator.choice((1, 2, 3, 4)))))
+    return library_items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1_000_000,
+                        help="The number of library items to create.")
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    library_items = generate_library_items(args.count)
+    elapsed = time.perf_counter() - start_time
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(library_items):,} library items: "
+          f"{allocated / len(library_items):.1f} bytes per item, "
+          f"built in {elapsed:.2f} seconds")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+module containing a load generator for the library server, reporting
+its throughput and latency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+
+async def send(reader, writer, request):
+    """
+    Send one request and wait for its response.
+    :param reader: an asyncio StreamReader
+    :param writer: an asyncio StreamWriter
+    :param request: a dict
+    :return: a dict, the response
+    """
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("The server closed the connection")
+    return json.loads(line)
+
+
+async def add_items(host, port, call_numbers, copies):
+    """
+    Add the books the benchmark checks out, keeping any that the server
+    already has.
+    :param host: a string
+    :param port: an int
+    :param call_numbers: a list of strings
+    :param copies: a positive int
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for number, call_number in enumerate(call_numbers):
+            await send(reader, writer, {"op": "add", "item": {
+                "type": "book", "call_number": call_number,
+                "title": f"Benchmark Volume {number}",
+                "num_copies": copies, "author": "Benchmark"}})
+    finally:
+        writer.close()
+
+
+async def run_client(host, port, call_numbers, requests, seed, latencies):
+    """
+    Send requests one after another on one connection: mostly checkouts
+    and returns of the copies this client holds, some title searches,
+    and some adds and removes of books of its own, which change the
+    title index while other clients search it.
+    :param host: a string
+    :param port: an int
+    :param call_numbers: a list of strings
+    :param requests: a positive int
+    :param seed: an int
+    :param latencies: a list the latency of each request is added to
+    :return: the number of requests that failed with an error
+    """
+    generator = random.Random(seed)
+    held = []
+    added = []
+    added_count = 0
+    errors = 0
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            choice = generator.random()
+            if choice < 0.1:
+                request = {"op": "find", "title": f"Benchmark Volume "
+                                                  f"{generator.randrange(1000)}"}
+            elif choice < 0.15:
+                request = {"op": "add", "item": {
+                    "type": "book",
+                    "call_number": f"bench.{seed}.{added_count}",
+                    "title": f"Benchmark Extra {seed} {added_count}",
+                    "num_copies": 1, "author": "Benchmark"}}
+                added_count += 1
+            elif added and choice < 0.2:
+                request = {"op": "remove",
+                           "call_number": added.pop(
+                               generator.randrange(len(added)))}
+            elif held and choice < 0.6:
+                request = {"op": "return",
+                           "call_number": held.pop(
+                               generator.randrange(len(held)))}
+            else:
+                request = {"op": "check_out",
+                           "call_number": generator.choice(call_numbers)}
+            start_time = time.perf_counter()
+            response = await send(reader, writer, request)
+            latencies.append(time.perf_counter() - start_time)
+            if "error" in response:
+                errors += 1
+            elif request["op"] == "check_out" and response["ok"]:
+                held.append(request["call_number"])
+            elif request["op"] == "add" and response["ok"]:
+                added.append(request["item"]["call_number"])
+        # give back what is still held and remove what was added so runs
+        # can be repeated
+        for call_number in held:
+            await send(reader, writer, {"op": "return",
+                                        "call_number": call_number})
+        for call_number in added:
+            await send(reader, writer, {"op": "remove",
+                                        "call_number": call_number})
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_benchmark(host, port, call_numbers, clients, requests):
+    """
+    Run clients concurrent connections, each sending requests requests.
+    :param host: a string
+    :param port: an int
+    :param call_numbers: a list of strings
+    :param clients: a positive int
+    :param requests: a positive int
+    :return: a tuple of the elapsed seconds, the request latencies and
+    the number of errors
+    """
+    latencies = []
+    start_time = time.perf_counter()
+    errors = await asyncio.gather(*(
+        run_client(host, port, call_numbers, requests, seed, latencies)
+        for seed in range(clients)))
+    return time.perf_counter() - start_time, latencies, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="The address of the server.")
+    parser.add_argument("-p", "--port", type=int, default=8765,
+                        help="The port of the server.")
+    parser.add_argument("-i", "--items", type=int, default=1000,
+                        help="The number of items to check out.")
+    parser.add_argument("-r", "--requests", type=int, default=1000,
+                        help="The number of requests sent per client.")
+    parser.add_argument("-c", "--clients", type=int, nargs="+",
+                        default=[1, 10, 50, 100],
+                        help="The numbers of concurrent clients to run with.")
+    args = parser.parse_args()
+
+    call_numbers = [f"bench.{number:06d}" for number in range(args.items)]
+    asyncio.run(add_items(args.host, args.port, call_numbers, 5))
+    print(f"{'clients':>8} {'requests/s':>12} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7}")
+    for clients in args.clients:
+        elapsed, latencies, errors = asyncio.run(run_benchmark(
+            args.host, args.port, call_numbers, clients, args.requests))
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(f"{clients:>8} {len(latencies) / elapsed:>12,.0f} "
+              f"{percentiles[49] * 1000:>8.2f} {percentiles[98] * 1000:>8.2f} "
+              f"{errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
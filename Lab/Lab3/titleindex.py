@@ -0,0 +1,141 @@
+"""
+module containing a trigram index for fuzzy title search.
+"""
+import difflib
+import heapq
+import math
+import threading
+from collections import Counter
+
+
+class TitleIndex:
+    """
+    Inverted index from character trigrams to the call numbers of the
+    library items whose titles contain them. A search only looks at
+    items that share enough trigrams with the query, and only the best
+    of those are scored with difflib. The index has its own lock, so
+    searches can run while other threads add and remove titles.
+    """
+
+    # the share of the query's trigrams a title needs to become a candidate
+    MIN_SHARED_TRIGRAMS = 0.2
+
+    # the largest number of candidates that get scored with difflib
+    MAX_CANDIDATES = 500
+
+    def __init__(self):
+        self._titles = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def trigrams(search_key):
+        """
+        Returns the set of character trigrams of a search key, padded so
+        that short words still have trigrams.
+        :param search_key: a casefolded string
+        :return: a set of strings
+        """
+        padded = f"  {search_key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, call_number, title, search_key):
+        """
+        Adds a title to the index, replacing any title previously added
+        with the same call number.
+        :param call_number: a string
+        :param title: a string, the title as it should be returned
+        :param search_key: a string, the casefolded title
+        """
+        with self._lock:
+            self._discard(call_number)
+            self._titles[call_number] = (title, search_key)
+            for trigram in self.trigrams(search_key):
+                self._postings.setdefault(trigram, set()).add(call_number)
+
+    def remove(self, call_number):
+        """
+        Removes the title with the given call number from the index if
+        it is there.
+        :param call_number: a string
+        """
+        with self._lock:
+            self._discard(call_number)
+
+    def _discard(self, call_number):
+        # removes a title while the lock is held
+        titles = self._titles.pop(call_number, None)
+        if titles is None:
+            return
+        for trigram in self.trigrams(titles[1]):
+            posting = self._postings[trigram]
+            posting.discard(call_number)
+            if not posting:
+                del self._postings[trigram]
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _candidates(self, query_trigrams):
+        """
+        Returns the call numbers sharing the most trigrams with the
+        query. Called while the lock is held. A title sharing at least k of the query's q trigrams
+        must contain one of its q - k + 1 rarest trigrams, so only
+        those posting lists are read, the rest are checked per
+        candidate.
+        :param query_trigrams: a set of strings
+        :return: a list of call numbers
+        """
+        ordered = sorted((trigram for trigram in query_trigrams
+                          if trigram in self._postings),
+                         key=lambda trigram: len(self._postings[trigram]))
+        if not ordered:
+            return []
+        required = max(1, math.ceil(len(query_trigrams)
+                                    * self.MIN_SHARED_TRIGRAMS))
+        probe_count = len(ordered) - required + 1
+        if probe_count < 1:
+            return []
+
+        shared = Counter()
+        for trigram in ordered[:probe_count]:
+            shared.update(self._postings[trigram])
+        remaining = ordered[probe_count:]
+        if remaining:
+            # the other trigrams are only counted for the titles most
+            # likely to make the cut
+            shortlist = shared.most_common(self.MAX_CANDIDATES * 2)
+            shared = Counter()
+            for call_number, count in shortlist:
+                title_trigrams = self.trigrams(self._titles[call_number][1])
+                shared[call_number] = count + sum(
+                    1 for trigram in remaining if trigram in title_trigrams)
+        return [call_number for call_number, count
+                in shared.most_common(self.MAX_CANDIDATES)
+                if count >= required]
+
+    def search(self, query, n=3, cutoff=0.5):
+        """
+        Return up to n titles similar to the query, best match first,
+        scored the same way as difflib.get_close_matches.
+        :param query: a string
+        :param n: a positive int, the most titles to return
+        :param cutoff: a float between 0 and 1, the lowest similarity
+        :return: a list of titles
+        """
+        query_trigrams = self.trigrams(query.casefold())
+        # only finding the candidates needs the lock, scoring them with
+        # difflib works on the title strings alone
+        with self._lock:
+            titles = [self._titles[call_number][0]
+                      for call_number in self._candidates(query_trigrams)]
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        scored = []
+        for title in titles:
+            matcher.set_seq1(title)
+            if matcher.real_quick_ratio() >= cutoff and \
+                    matcher.quick_ratio() >= cutoff and \
+                    matcher.ratio() >= cutoff:
+                scored.append((matcher.ratio(), title))
+        return [title for _, title in heapq.nlargest(n, scored)]
@@ -0,0 +1,210 @@
+"""
+This module is responsible for benchmarking the BookAnalyzer versions
+against each other on generated books, timing reading and finding the
+unique words separately and checking every version finds the same words
+and, where it counts them, the same counts.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Lab.Lab7 import book_analyzer_optimized, book_analyzer_profiled
+
+# the analyzers benchmarked, with the method each uses to read a book
+IMPLEMENTATIONS = {
+    "profiled": (book_analyzer_profiled.BookAnalyzer, "read_data"),
+    "optimized": (book_analyzer_optimized.BookAnalyzer, "read_data"),
+    "streaming": (book_analyzer_optimized.BookAnalyzer, "stream_data"),
+    "mmap": (book_analyzer_optimized.BookAnalyzer, "map_data"),
+}
+
+STAGES = ("read_data", "find_unique_words")
+
+
+def generate_book(path, word_count, vocabulary_size=5000, seed=0):
+    """
+    Writes a book of random words whose frequencies follow Zipf's law,
+    as they do in real text, with capitals, punctuation and blank lines.
+    :param path: the name of the file to write, a string
+    :param word_count: a positive int
+    :param vocabulary_size: a positive int, the number of distinct words
+    :param seed: an int
+    """
+    generator = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(generator.choice(letters)
+                          for _ in range(generator.randint(1, 12)))
+                  for _ in range(vocabulary_size)]
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+    words = generator.choices(vocabulary, weights, k=word_count)
+    with open(path, mode='w', encoding='utf-8') as book_file:
+        line = []
+        for word in words:
+            roll = generator.random()
+            if roll < 0.05:
+                word = word.capitalize()
+            elif roll < 0.15:
+                word += generator.choice(",.;:")
+            elif roll < 0.17:
+                word = f"({word})"
+            line.append(word)
+            if len(line) >= 12:
+                book_file.write(" ".join(line) + "\n")
+                if generator.random() < 0.1:
+                    book_file.write("\n")
+                line = []
+        book_file.write(" ".join(line) + "\n")
+
+
+def run_stages(implementation, src):
+    """
+    Reads a book with a new analyzer and finds its unique words, timing
+    each stage on its own.
+    :param implementation: a key of IMPLEMENTATIONS
+    :param src: the name of the file, a string
+    :return: a tuple of a dict of stage names to seconds, the unique
+    words found and the analyzer
+    """
+    analyzer_class, read_method = IMPLEMENTATIONS[implementation]
+    book_analyzer = analyzer_class()
+    gc.collect()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        getattr(book_analyzer, read_method)(src)
+        read_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        unique_words = book_analyzer.find_unique_words()
+        find_time = time.perf_counter() - start_time
+    finally:
+        gc.enable()
+    return {"read_data": read_time, "find_unique_words": find_time}, \
+        unique_words, book_analyzer
+
+
+def measure_peak_memory(implementation, src):
+    """
+    Returns the peak memory traced during each stage, counting what the
+    analyzer already holds from earlier stages. This is measured on a
+    run of its own since tracing allocations slows the stages down.
+    :param implementation: a key of IMPLEMENTATIONS
+    :param src: the name of the file, a string
+    :return: a dict of stage names to bytes
+    """
+    analyzer_class, read_method = IMPLEMENTATIONS[implementation]
+    book_analyzer = analyzer_class()
+    peaks = {}
+    gc.collect()
+    tracemalloc.start()
+    try:
+        getattr(book_analyzer, read_method)(src)
+        peaks["read_data"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        book_analyzer.find_unique_words()
+        peaks["find_unique_words"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def benchmark(implementation, src, trials=5, warmup=1):
+    """
+    Benchmarks one implementation on one book.
+    :param implementation: a key of IMPLEMENTATIONS
+    :param src: the name of the file, a string
+    :param trials: a positive int, the timed runs
+    :param warmup: a non-negative int, the untimed runs first
+    :return: a tuple of a dict of results per stage, the set of unique
+    words found, lowercased, and the word counts, or None for versions
+    that do not count words
+    """
+    for _ in range(warmup):
+        run_stages(implementation, src)
+    times = {stage: [] for stage in STAGES}
+    unique_words = None
+    book_analyzer = None
+    for _ in range(trials):
+        stage_times, unique_words, book_analyzer = run_stages(implementation,
+                                                              src)
+        for stage in STAGES:
+            times[stage].append(stage_times[stage])
+    peaks = measure_peak_memory(implementation, src)
+    results = {stage: {"min_seconds": min(times[stage]),
+                       "median_seconds": statistics.median(times[stage]),
+                       "seconds": times[stage],
+                       "peak_memory_bytes": peaks[stage]}
+               for stage in STAGES}
+    word_counts = dict(book_analyzer.text) \
+        if isinstance(book_analyzer.text, dict) else None
+    # the profiled version keeps the case of the first spelling it sees
+    return results, {word.lower() for word in unique_words}, word_counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-w", "--words", type=int, nargs="+",
+                        default=[1000, 10000],
+                        help="The sizes of the books to generate, in words.")
+    parser.add_argument("-i", "--implementations", nargs="+",
+                        choices=IMPLEMENTATIONS, default=list(IMPLEMENTATIONS),
+                        help="The implementations to benchmark.")
+    parser.add_argument("-t", "--trials", type=int, default=5,
+                        help="The number of timed runs.")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="The number of untimed runs before timing.")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="The seed the books are generated from.")
+    parser.add_argument("-o", "--output",
+                        help="A file to write the JSON report to instead of "
+                             "printing it.")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "trials": args.trials,
+              "warmup": args.warmup, "seed": args.seed, "books": []}
+    all_agree = True
+    with tempfile.TemporaryDirectory() as directory:
+        for word_count in args.words:
+            src = os.path.join(directory, f"book_{word_count}.txt")
+            generate_book(src, word_count, seed=args.seed)
+            book = {"words": word_count, "bytes": os.path.getsize(src),
+                    "results": {}}
+            outputs = {}
+            counts = {}
+            for implementation in args.implementations:
+                book["results"][implementation], outputs[implementation], \
+                    counts[implementation] = benchmark(
+                        implementation, src, args.trials, args.warmup)
+            book["unique_words"] = {implementation: len(words)
+                                    for implementation, words
+                                    in outputs.items()}
+            book["words_agree"] = len({frozenset(words) for words
+                                       in outputs.values()}) <= 1
+            # the versions that count words must also agree on every count
+            word_counts = [word_count for word_count in counts.values()
+                           if word_count is not None]
+            book["counts_agree"] = all(word_count == word_counts[0]
+                                       for word_count in word_counts)
+            book["outputs_agree"] = book["words_agree"] and \
+                book["counts_agree"]
+            all_agree = all_agree and book["outputs_agree"]
+            report["books"].append(book)
+    report["outputs_agree"] = all_agree
+
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if not all_agree:
+        sys.exit("The implementations found different words or counts")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,12 @@ that you won't find this in the workplace) BookAnalyzer class that needs
 to be profiled and optimized.
 """
 import functools
+import heapq
+import mmap
+import operator
+import re
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 
 class BookAnalyzer:
@@ -18,6 +22,32 @@ class BookAnalyzer:
     # a constant to help filter out common punctuation.
     COMMON_PUNCTUATION = ",*;.:([])"
 
+    # a table for str.translate that deletes the common punctuation.
+    PUNCTUATION_TABLE = str.maketrans("", "", COMMON_PUNCTUATION)
+
+    # the number of characters (bytes for map_data) counted at a time.
+    CHUNK_SIZE = 1 << 16
+
+    # the most characters of a word carried from one chunk to the next.
+    # A longer run of text without whitespace is counted in pieces.
+    MAX_WORD_LENGTH = 1 << 20
+
+    # the common punctuation as bytes, for bytes.translate to delete.
+    PUNCTUATION_BYTES = COMMON_PUNCTUATION.encode("ascii")
+
+    # a table for bytes.translate that turns the separators str.split
+    # splits on but bytes.split does not into spaces.
+    SEPARATOR_TABLE = bytes.maketrans(b"\x1c\x1d\x1e\x1f", b"    ")
+
+    # the non-ASCII separators of str.split, encoded as UTF-8.
+    NON_ASCII_WHITESPACE = tuple(
+        chr(code_point).encode("utf-8")
+        for code_point in (0x85, 0xa0, 0x1680, *range(0x2000, 0x200b),
+                           0x2028, 0x2029, 0x202f, 0x205f, 0x3000))
+
+    # an ASCII separator, where a memory-mapped file is cut into chunks.
+    ASCII_WHITESPACE = re.compile(rb"[ \t\n\r\x0b\x0c\x1c-\x1f]")
+
     def __init__(self):
         self.text = None
 
@@ -52,6 +82,133 @@ class BookAnalyzer:
                     word_freq[word.lower()] += 1
         self.text = word_freq
 
+    @classmethod
+    def count_chunk(cls, text, word_freq):
+        """
+        Counts the words in a piece of text that does not end part way
+        through a word. The whole piece is stripped of punctuation and
+        lowercased at once rather than word by word.
+        :param text: a string
+        :param word_freq: a Counter the words are added to
+        """
+        words = text.translate(cls.PUNCTUATION_TABLE).lower().split()
+        word_freq.update(words)
+        # words made only of punctuation vanish from the split above,
+        # read_data counts each of them as an empty string
+        empty_words = len(text.split()) - len(words)
+        if empty_words:
+            word_freq[""] += empty_words
+
+    @classmethod
+    def count_words(cls, chunks):
+        """
+        Counts the words in text arriving in chunks, where a word may be
+        split between two chunks. Only one chunk, and at most
+        MAX_WORD_LENGTH characters of the word it ends with, are held at
+        a time.
+        :param chunks: an iterable of strings
+        :return: a Counter of words
+        """
+        word_freq = Counter()
+        partial_word = ""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if chunk[-1].isspace():
+                cls.count_chunk(partial_word + chunk, word_freq)
+                partial_word = ""
+                continue
+            # keep the word running to the end of the chunk for the next
+            # one, found by searching back from the end of this chunk only
+            last_word = chunk.rsplit(maxsplit=1)[-1]
+            end = len(chunk) - len(last_word)
+            if end:
+                cls.count_chunk(partial_word + chunk[:end], word_freq)
+                partial_word = last_word
+            else:
+                partial_word += chunk
+                if len(partial_word) > cls.MAX_WORD_LENGTH:
+                    cls.count_chunk(partial_word, word_freq)
+                    partial_word = ""
+        cls.count_chunk(partial_word, word_freq)
+        return word_freq
+
+    def stream_data(self, src="House of Usher.txt", chunk_size=CHUNK_SIZE):
+        """
+        Counts the words of a text file like read_data, but reads the
+        file chunk_size characters at a time instead of all at once, so
+        files larger than memory can be analyzed.
+        :param src: the name of the file, a string
+        :param chunk_size: a positive int
+        """
+        with open(src, mode='r', encoding='utf-8') as book_file:
+            self.text = self.count_words(
+                iter(functools.partial(book_file.read, chunk_size), ""))
+
+    @classmethod
+    def count_bytes_chunk(cls, chunk, byte_freq):
+        """
+        Counts the words in a piece of UTF-8 text without decoding it.
+        Punctuation is deleted and ASCII letters are lowercased at the
+        bytes level, the same as count_chunk does for ASCII text.
+        :param chunk: bytes that do not end part way through a word
+        :param byte_freq: a Counter the words are added to, as bytes
+        """
+        chunk = chunk.translate(cls.SEPARATOR_TABLE)
+        if not chunk.isascii():
+            for whitespace in cls.NON_ASCII_WHITESPACE:
+                chunk = chunk.replace(whitespace, b" ")
+        words = chunk.translate(None, cls.PUNCTUATION_BYTES) \
+            .lower().split()
+        byte_freq.update(words)
+        empty_words = len(chunk.split()) - len(words)
+        if empty_words:
+            byte_freq[b""] += empty_words
+
+    @staticmethod
+    def decode_word_counts(byte_freq):
+        """
+        Decodes words counted as bytes. Only the distinct words are
+        decoded, and words with non-ASCII letters are lowercased again,
+        which may merge some of them.
+        :param byte_freq: a Counter of words as UTF-8 bytes
+        :return: a Counter of words
+        """
+        word_freq = Counter()
+        for word, count in byte_freq.items():
+            if word.isascii():
+                word_freq[word.decode("ascii")] += count
+            else:
+                word_freq[word.decode("utf-8").lower()] += count
+        return word_freq
+
+    def map_data(self, src="House of Usher.txt", chunk_size=CHUNK_SIZE):
+        """
+        Counts the words of a text file like read_data, but memory-maps
+        the file and counts its words as bytes, only decoding each
+        distinct word once at the end. This allocates far less than
+        decoding the file for text that is mostly ASCII.
+        :param src: the name of the file, a string
+        :param chunk_size: a positive int, the bytes counted at a time
+        """
+        byte_freq = Counter()
+        with open(src, mode='rb') as book_file:
+            # an empty file cannot be mapped
+            if book_file.seek(0, 2):
+                with mmap.mmap(book_file.fileno(), 0,
+                               access=mmap.ACCESS_READ) as mapped_file:
+                    start = 0
+                    while start < len(mapped_file):
+                        # end the chunk at a separator so no word is split
+                        separator = self.ASCII_WHITESPACE.search(
+                            mapped_file, start + chunk_size)
+                        end = separator.start() if separator \
+                            else len(mapped_file)
+                        self.count_bytes_chunk(mapped_file[start:end],
+                                               byte_freq)
+                        start = end
+        self.text = self.decode_word_counts(byte_freq)
+
     def find_unique_words(self):
         """
         Filters out all the words in the text.
@@ -59,6 +216,39 @@ class BookAnalyzer:
         """
         return self.text.keys()
 
+    def find_hapax_legomena(self):
+        """
+        Filters out the words that appear exactly once in the text.
+        :return: a list of words in the order they first appear.
+        """
+        return [word for word, count in self.text.items() if count == 1]
+
+    def find_most_common_words(self, k):
+        """
+        Finds the k most frequent words with a heap, without sorting the
+        whole vocabulary. Words with the same count keep the order they
+        first appear in.
+        :param k: a non-negative int
+        :return: a list of up to k (word, count) tuples, most frequent
+        first.
+        """
+        return heapq.nlargest(k, self.text.items(),
+                              key=operator.itemgetter(1))
+
+    def find_words_by_frequency(self, min_count=1, max_count=None):
+        """
+        Filters out the words that appear between min_count and max_count
+        times, both included.
+        :param min_count: an int
+        :param max_count: an int, or None for no upper limit
+        :return: a list of words in the order they first appear.
+        """
+        if max_count is None:
+            return [word for word, count in self.text.items()
+                    if count >= min_count]
+        return [word for word, count in self.text.items()
+                if min_count <= count <= max_count]
+
 
 def main():
     start_time = time.time()
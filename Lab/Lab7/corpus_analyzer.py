@@ -0,0 +1,124 @@
+"""
+This module is responsible for counting the words of a whole corpus of
+books, one book per process, and merging the counts.
+"""
+import argparse
+import functools
+import glob
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from Lab.Lab7.book_analyzer_optimized import BookAnalyzer
+
+
+def find_books(source, pattern="*.txt"):
+    """
+    Returns the books in a directory, or matching a glob.
+    :param source: a directory, or a glob such as "books/**/*.txt"
+    :param pattern: a string, the glob used to find books in a directory
+    :return: a sorted list of file names
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, pattern)
+    return sorted(path for path in glob.glob(source, recursive=True)
+                  if os.path.isfile(path))
+
+
+def count_book(src, chunk_size=BookAnalyzer.CHUNK_SIZE):
+    """
+    Counts the words of one book, streaming it in chunks.
+    :param src: the name of the file, a string
+    :param chunk_size: a positive int
+    :return: a tuple of the file name and a Counter of its words
+    """
+    book_analyzer = BookAnalyzer()
+    book_analyzer.stream_data(src, chunk_size)
+    return src, book_analyzer.text
+
+
+class CorpusAnalyzer:
+    """
+    This class provides the ability to count the words of many books in
+    parallel, keeping the counts of each book and of the whole corpus.
+    """
+
+    def __init__(self):
+        # word counts of each book, by file name
+        self.document_freqs = {}
+        # word counts of the whole corpus
+        self.word_freq = Counter()
+
+    def analyze(self, source, workers=None, pattern="*.txt",
+                chunk_size=BookAnalyzer.CHUNK_SIZE):
+        """
+        Counts the words of every book in a corpus. Books are counted in
+        a pool of processes, largest first so one large book left to the
+        end does not keep the others idle, and the counts are merged as
+        each book finishes.
+        :param source: a directory, or a glob of files
+        :param workers: the number of processes, None for one per core or
+        1 to count in this process
+        :param pattern: a string, the glob used to find books in a directory
+        :param chunk_size: a positive int, the characters read at a time
+        :return: a tuple of the corpus Counter and a dict of file names to
+        the Counter of each book
+        """
+        paths = find_books(source, pattern)
+        count = functools.partial(count_book, chunk_size=chunk_size)
+        by_size = sorted(paths, key=os.path.getsize, reverse=True)
+        document_freqs = {}
+        word_freq = Counter()
+        if workers == 1:
+            self._merge(map(count, by_size), document_freqs, word_freq)
+        else:
+            with Pool(workers) as pool:
+                self._merge(pool.imap_unordered(count, by_size),
+                            document_freqs, word_freq)
+        self.document_freqs = {path: document_freqs[path] for path in paths}
+        self.word_freq = word_freq
+        return self.word_freq, self.document_freqs
+
+    @staticmethod
+    def _merge(results, document_freqs, word_freq):
+        for path, document_freq in results:
+            document_freqs[path] = document_freq
+            word_freq.update(document_freq)
+
+    def find_unique_words(self):
+        """
+        Filters out all the words in the corpus.
+        :return: a list of all the unique words.
+        """
+        return self.word_freq.keys()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source",
+                        help="A directory of books, or a glob of files.")
+    parser.add_argument("-p", "--pattern", default="*.txt",
+                        help="The glob used to find books in a directory.")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="The number of processes, one per core if "
+                             "not given.")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    corpus_analyzer = CorpusAnalyzer()
+    word_freq, document_freqs = corpus_analyzer.analyze(
+        args.source, args.workers, args.pattern)
+    print("-" * 50)
+    print(f"Documents: {len(document_freqs)}, words: "
+          f"{sum(word_freq.values())}, unique words: {len(word_freq)}")
+    print("-" * 50)
+    for path, document_freq in document_freqs.items():
+        print(f"{path}: {sum(document_freq.values())} words, "
+              f"{len(document_freq)} unique")
+    print("-" * 50)
+    print("--- %s seconds ---" % (time.time() - start_time))
+
+
+if __name__ == '__main__':
+    main()